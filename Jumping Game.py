@@ -1,649 +1,352 @@
+import argparse
+import atexit
+import gc
 import os
 import sys
+import time
 
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 
 import pygame
-pygame.init()
-pygame.key.set_repeat(200, 0)
-
-#Helper functions
-def resourcePath(relativePath, subdir=''):
-    ''' Get absolute path to resource, works for dev and for PyInstaller '''
-    try:
-        #PyInstaller creates a temp folder and stores path in _MEIPASS
-        basePath = sys._MEIPASS
-    except Exception:
-        relativePath = os.path.join(subdir, relativePath)
-        if relativePath.endswith('.mp3'):
-            #Music files
-            basePath = os.path.abspath('Music')
-        elif relativePath.endswith('.txt'):
-            #Text files
-            basePath = os.path.abspath('Text Files')
+import animation
+import assets
+import display
+import engine
+import fonts
+import scenes
+from audio import AudioManager
+from profiler import FrameProfiler, Overlay
+from render import Renderer, circle, healthBar, sprite
+from scenes import MenuScreen, PauseScreen
+from timing import FixedTimestep, lerp, refreshRate
+from ui import Button
+
+parser = argparse.ArgumentParser(description='Jumping Game')
+parser.add_argument('--record', metavar='FILE', help="record both players' inputs to FILE")
+parser.add_argument('--replay', metavar='FILE', help='play back a recorded match instead of the keyboard')
+parser.add_argument('--fps', type=int, help='frame rate cap, defaults to the display refresh rate')
+parser.add_argument('--lockstep', action='store_true', help='render exactly one frame per logic tick')
+parser.add_argument('--profile-trace', metavar='FILE', help='write per-frame section timings to a .csv or .json FILE')
+parser.add_argument('--net', metavar='HOST:PORT', help='play over UDP against the game running at HOST:PORT')
+parser.add_argument('--net-player', type=int, choices=(1, 2), default=1, help='player controlled on this machine')
+parser.add_argument('--net-port', type=int, default=47800, help='local UDP port for --net')
+parser.add_argument('--net-latency', type=float, default=0.0, help='extra one way delay in ms, for testing')
+parser.add_argument('--net-loss', type=float, default=0.0, help='fraction of packets to drop, for testing')
+parser.add_argument('--load-state', metavar='FILE', help='start from a saved game state, e.g. a crash dump')
+parser.add_argument('--cpu', type=int, choices=(1, 2), help='let the computer play this player')
+parser.add_argument('--cpu-budget', type=float, default=8.0, help='most ms the computer may think per tick')
+parser.add_argument('--window', metavar='WIDTHxHEIGHT', help='window size, the game is scaled to fit it')
+parser.add_argument('--fullscreen', action='store_true', help='scale the game up to the whole screen')
+parser.add_argument('--integer-scale', action='store_true', help='only scale by whole numbers, sharper but with wider borders')
+parser.add_argument('--telemetry', metavar='FILE', help='log match events to FILE, as NDJSON or binary for a .jgtl FILE')
+parser.add_argument('--attract', action='store_true', help='let the computer play itself, match after match, until a key is pressed')
+parser.add_argument('--attract-after', type=float, metavar='SECONDS', help='go into attract mode when the menu is left alone this long')
+parser.add_argument('--max-memory', type=int, default=512, metavar='MB', help='attract mode restarts the game when it uses more memory')
+parser.add_argument('--min-fps', type=float, default=10.0, help='attract mode restarts the game when the frame rate stays below this')
+
+CHARACTERS = engine.GAME['characters']
+
+def keyLayouts():
+    ''' Keyboard layout of each player from game.json, key codes mapped onto the engine's input bits
+
+    pygame.key.key_code() needs the display initialised.
+    '''
+    return [{pygame.key.key_code(name): getattr(engine, action) for name, action in c['keys'].items()}
+            for c in CHARACTERS]
+
+def readInputs(keys, layouts):
+    ''' Converts pygame.key.get_pressed() into the pair of engine input masks '''
+    keys1 = keys2 = 0
+    for key, bit in layouts[0].items():
+        if keys[key]: keys1 |= bit
+    for key, bit in layouts[1].items():
+        if keys[key]: keys2 |= bit
+    return keys1, keys2
+
+def positions(s):
+    found = {number: (p.x, p.y) for number, p in enumerate(s.players, 1)}
+    for slot, x, y, radius, colour in s.bullets.rows():
+        found[('bullet', slot)] = (x, y)
+    return found
+
+def main(argv=None):
+    ''' Menu, then the match until the window is closed '''
+    commandLine = list(sys.argv[1:] if argv is None else argv)
+    args = parser.parse_args(commandLine)
+    windowSize = None
+    if args.window:
+        try:
+            windowSize = tuple(int(n) for n in args.window.lower().split('x'))
+        except ValueError:
+            windowSize = ()
+        if len(windowSize) != 2 or min(windowSize) <= 0:
+            parser.error('--window takes WIDTHxHEIGHT, e.g. 1700x960')
+    if args.net and (args.replay or args.record):
+        parser.error('--net cannot be combined with --replay or --record')
+    if args.cpu and (args.net or args.replay):
+        parser.error('--cpu cannot be combined with --net or --replay')
+    if (args.attract or args.attract_after) and (args.net or args.replay or args.record or args.cpu or args.profile_trace):
+        parser.error('attract mode cannot be combined with --net, --replay, --record, --cpu or --profile-trace')
+
+    #Just the modules the menu needs, the audio thread opens the mixer itself
+    pygame.display.init()
+    pygame.font.init()
+    pygame.key.set_repeat(200, 0)
+    layouts = keyLayouts()
+
+    #Everything draws at 850x480 onto game, view puts it on the real window
+    game = display.setMode(windowSize, args.fullscreen, args.integer_scale)
+    view = display.viewport
+    pygame.display.set_caption('Jumping Game')
+    pygame.display.set_icon(assets.load('gameIcon.png'))
+
+    #Decoded in the background so the win song never stalls a frame, music.mp3 may be missing
+    audio = AudioManager({'gameplay': 'music.mp3', 'victory': 'Shaabaashiyaan.mp3'})
+    audio.preload()
+
+    bg = assets.image(engine.GAME['arena']['background'])
+    playback = recorder = None
+    unattended = args.attract
+    if args.replay or args.record:
+        import replay
+    if args.replay:
+        recording = replay.load(args.replay)
+        player1, player2 = recording.names
+        playback = iter(recording)
+    elif unattended:
+        player1, player2 = [c['name'] for c in CHARACTERS]
+    else:
+        #player1, player2 = 'Sanvit', 'Tanaya'
+        idle = int(args.attract_after*1000) if args.attract_after else None
+        names = scenes.run(MenuScreen(game, bg, assets.image('gameLogo.png'), idle))
+        unattended = names is None#Nobody came to play
+        player1, player2 = names or [c['name'] for c in CHARACTERS]
+    if args.record:
+        recorder = replay.Recorder(args.record, (player1, player2))
+        atexit.register(recorder.close)#Also covers quitting from the pause screen
+    eventLog = None
+    if args.telemetry:
+        import telemetry
+        eventLog = telemetry.Telemetry(args.telemetry)
+        atexit.register(eventLog.close)
+
+    #The match's own images, the pause screen's too so pausing never hits the disk
+    assets.preload([('paused.png', '')] + [(c['portrait'], c['folder']) for c in CHARACTERS])
+    names = ('walkLeft', 'walkRight', 'punchLeft', 'punchRight', 'jumpLeft', 'jumpRight', 'flyLeft', 'flyRight')
+    frames = assets.animations({(number, name): (c['folder'], c[name])
+                                for number, c in enumerate(CHARACTERS, 1) for name in names})
+    animations = [animation.Animation(c, {name: frames[(number, name)] for name in names})
+                  for number, c in enumerate(CHARACTERS, 1)]
+    view.prescale([bg] + [image for a in animations for image in a.frames()])
+
+    state = engine.GameState()
+    if args.load_state:
+        with open(args.load_state, 'rb') as f:
+            state.restore(f.read())
+    session = None
+    if args.net:
+        import netplay
+        host, port = args.net.rsplit(':', 1)
+        transport = netplay.UdpTransport(args.net_port, (host, int(port)))
+        if args.net_latency or args.net_loss:
+            transport = netplay.LossyTransport(transport, args.net_latency/1000.0, 0.0, args.net_loss)
+        session = netplay.RollbackSession(args.net_player, transport, state)
+    planner = None
+    if args.cpu:
+        import ai
+        planner = ai.Planner(args.cpu, args.cpu_budget/1000.0)
+    bots = watchdog = None
+    if unattended:
+        import attract
+        bots = attract.Bots(args.cpu_budget/1000.0)
+        watchdog = attract.Watchdog(args.max_memory*2**20, args.min_fps)
+
+    def restart(reason, measured=0):
+        ''' Leaves attract mode for a fresh copy of the game, at the menu when a player turned up '''
+        if eventLog:
+            eventLog.restart(reason, measured)
+            eventLog.close()
         else:
-            #Image files
-            basePath = os.path.abspath('Images')
-    return os.path.join(basePath, relativePath)
+            attract.log('restarting for %s%s' % (reason, ' at %.1f' % measured if measured else ''))
+        pygame.quit()
+        attract.restart([arg for arg in commandLine if arg != '--attract'] if reason == 'player' else commandLine)
+
+    run = True
+    GAME_RESET = False
+    resetFrom = 'key'#What asked for the next RESET, for telemetry
+
+    renderer = Renderer(view, bg)
+    frameProfiler = renderer.profiler = FrameProfiler(trace=bool(args.profile_trace))
+    if args.profile_trace:
+        atexit.register(frameProfiler.dump, args.profile_trace)
+    overlay = Overlay(frameProfiler, fonts.font('Courier New', 16))#F3 shows it
+    pauseBtn = Button(game, (340, 20), 'Pause', pad=2)
+    playAgainBtn = None
+
+    def text(slot, string, position):
+        return sprite(view, slot, fonts.render(font, string, 1, (0,0,0)), position)
+
+    previous = {}#Positions before the last tick, rendering interpolates from them
+
+    def redrawgame(alpha=1.0):#Main drawing fuction of game
+        nonlocal playAgainBtn
+        p1, p2 = state.p1, state.p2
+
+        items = [sprite(view, 'pause', pauseBtn.image(), pauseBtn.rect.topleft)]
+        for number, (name, p, c) in enumerate(zip((player1, player2), state.players, CHARACTERS), 1):
+            items.append(text(('health', number), str(name) + "'s Health: " + str(p.health), c['hud']))
+        if not p1.alive:
+            items.append(text('win', str(player2) + ' Wins! Congratulations!', (250, 100)))
+        elif not p2.alive:
+            items.append(text('win', str(player1) + ' Wins! Congratulations!', (250, 100)))
+
+        if not all([p1.alive, p2.alive]):
+            if playAgainBtn is None:
+                playAgainBtn = Button(game, (310, 150), 'Play Again', pad=2)
+            items.append(sprite(view, 'playAgain', playAgainBtn.image(), playAgainBtn.rect.topleft))
+        else:#However the match restarted, the peer's RESET included, the button has to stop taking clicks
+            playAgainBtn = None
+
+        bars = []#Over every fighter, and the fighters go to the screen in one batch
+        for number, (p, c, a) in enumerate(zip(state.players, CHARACTERS, animations), 1):
+            if not p.alive:
+                continue
+            x, y = lerp(previous.get(number), (p.x, p.y), alpha)
+            items.append(sprite(view, ('player', number), a.image(p, state.ticks), (x,y)))
+            barX, barY, width = c['healthBar']
+            bars.append(healthBar(view, ('bar', number), x + barX, y + barY, width,
+                                  c['health'] - p.health, width // c['health']))
+        items += bars
+
+        for slot, x, y, radius, colour in state.bullets.rows():
+            x, y = lerp(previous.get(('bullet', slot)), (x, y), alpha)
+            items.append(circle(view, ('bullet', slot), x, y, radius, colour))
+        if overlay.visible:
+            items.append(sprite(view, 'overlay', overlay.image(), overlay.position))
+
+        renderer.present(items)#Updates the changed parts of the screen
+    #MAINLOOP STARTS HERE
+    font = fonts.font('comicsans', 30, True)
+    #The logic always ticks at engine.TICK_RATE, frames are drawn as often as fps allows
+    timestep = FixedTimestep(engine.TICK_RATE, lockstep=args.lockstep)
+    fps = engine.TICK_RATE if args.lockstep else (args.fps or refreshRate())
+    drawTime = 0.0#Recent worst redrawgame() time, what the planner has to leave for drawing
+    #Modules, assets and the menu all live until the window closes, a full collection that
+    #scanned them would take longer than a frame. The planner's search runs without collections
+    gc.freeze()
+    try:
+        while run:
+            scenes.clock.tick(fps)
+            frameProfiler.begin()
+
+            audio.play('gameplay' if state.p1.alive and state.p2.alive else 'victory')
+            audio.update()
 
-def exitGame():
-    pygame.quit()
-    sys.exit()
-
-#UI Tools
-class Button:
-    def __init__(self, screen, position, text, **kwargs):
-        self.screen = screen
-        self.position = position
-        self.font = pygame.font.SysFont('Garamond', 40)
-        self.bg = kwargs.get('bg', (255,165,0))
-        self.fg = kwargs.get('fg', (255, 0, 0))
-        states = ['normal', 'disabled']
-        self.state = kwargs.get('state', 'normal')
-        pad = kwargs.get('pad', 0)
-        self.text_render = self.font.render(text.center(len(text) + pad), 1, self.fg)
-        self.draw()
-        
-    def draw(self):
-        x, y, w, h = self.text_render.get_rect()
-        x, y = self.position
-        pygame.draw.line(self.screen, self.bg, (x, y), (x + w , y), 5)
-        pygame.draw.line(self.screen, self.bg, (x, y - 2), (x, y + h), 5)
-        pygame.draw.line(self.screen, [abs(val-100) for val in self.bg], (x, y + h), (x + w , y + h), 5)
-        pygame.draw.line(self.screen, [abs(val-100) for val in self.bg], (x + w , y+h), [x + w , y], 5)
-        pygame.draw.rect(self.screen, [abs(val-50) for val in self.bg], (x, y, w , h))
-        self.render_object = self.screen.blit(self.text_render, (x, y))
-
-    def clicked(self):
-        if self.state == 'normal':
-            return self.render_object.collidepoint(pygame.mouse.get_pos())
-        return False
-
-class InputBox:
-    def __init__(self, x, y, w, h, text=''):
-        self.COLOR_INACTIVE = (255, 0, 0)
-        self.COLOR_ACTIVE = (0, 0, 255)
-        self.GEN_COLOR = (34, 139, 34)
-        self.rect = pygame.Rect(x, y, w, h)
-        self.color = self.COLOR_INACTIVE
-        self.defaultText = self.text = text
-        self.font = pygame.font.SysFont('Arial', 50)
-        self.txt_surface = self.font.render(text, True, self.color)
-        self.active = False
-        self.val = ''
-
-    def handle_event(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            #If the user clicked on the input_box rect.
-            if self.rect.collidepoint(event.pos):
-                #Toggle the active variable.
-                self.active = not self.active
-                if self.text == '':
-                    self.text = self.defaultText
-                elif self.text == self.defaultText:
-                    self.text = ''
-                self.txt_surface = self.font.render(self.text, True, self.color)
-            else:
-                self.active = False
-            #Change the current color of the input box.
-            if self.active:
-                self.color = self.COLOR_ACTIVE
-            elif self.val:
-                self.color = self.GEN_COLOR
-            else:
-                self.color = self.COLOR_INACTIVE
-                
-        if event.type == pygame.KEYDOWN:
-            if self.active:
-                if event.key == pygame.K_RETURN:
-                    self.val = self.text
-                    self.color = self.GEN_COLOR
-                    self.active = False
-                elif event.key == pygame.K_BACKSPACE:
-                    self.text = self.text[:-1]
-                elif len(self.text) < 10:
-                    self.text += event.unicode
-                #Re-render the text.
-                self.txt_surface = self.font.render(self.text, True, self.color)
-
-    def update(self):
-        #Resize the box if the text is too long.
-        width = max(200, self.txt_surface.get_width()+10)
-        self.rect.w = width
-
-    def draw(self, screen):
-        #Blit the text.
-        screen.blit(self.txt_surface, (self.rect.x+5, self.rect.y+5))
-        #Blit the rect.
-        pygame.draw.rect(screen, self.color, self.rect, 2)
-
-class ControlScreen:
-    def __init__(self, screen, bg, textFg=(255, 0, 0)):
-        self.screen = screen
-        self.bg = bg
-        self.title = pygame.image.load(resourcePath('controls.png'))
-        self.font = pygame.font.SysFont('Didot', 40)
-        self.textFg = textFg
-        with open(resourcePath('controls.txt'), 'r', encoding='utf-8') as f:
-            delimiter = f.read(1)
-            self.text = f.read()
-        self.controls = self.text.split(delimiter)
-        self.displayUI()
-        self.mainloop()
-
-    def displayUI(self):
-        self.screen.blit(self.bg, (0, 0))
-        self.screen.blit(self.title, (225, 0))
-        xStart = 70
-        yStart = 60
-        for i in range(len(self.controls)-1):
-            for j, line in enumerate(self.controls[i].splitlines()):
-                text_render = self.font.render(line, 1, self.textFg)
-                self.screen.blit(text_render, (xStart + i*400, yStart + j*40))
-        self.backBtn = Button(self.screen, (0, 0), '\u2190', pad=2)
-        pygame.draw.line(self.screen, (255, 0, 0), (400, 100),
-                         (400, self.screen.get_height()-25), 3)
-
-    def mainloop(self):
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    exitGame()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        exitGame()
-                    key_to_start = (event.key in [pygame.K_s, pygame.K_RIGHT,
-                                                  pygame.K_UP, pygame.K_RETURN,
-                                                  pygame.K_BACKSPACE])
-                    if key_to_start:
-                        return
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if self.backBtn.clicked():
-                        return
-                        
-            pygame.display.update()
-    
-class MenuScreen:
-    ''' Game start screen, returns the player names '''
-    def __init__(self, screen, bg, title):
-        self.screen = screen
-        self.bg = bg
-        self.title = title
-        self.player1_img = pygame.image.load(resourcePath('Player1.png', subdir='Player 1'))
-        self.player2_img = pygame.image.load(resourcePath('Player2.png', subdir='Player 2'))
-        self.displayUI()
-        self.entryWidgets = [InputBox(40, 100, 200, 75, 'Enter name'),
-                             InputBox(560, 100, 200, 75, 'Enter name')]
-                             
-        self.mainloop()
-        
-    def displayUI(self):
-        #Blitting images
-        self.screen.blit(self.bg, (0, 0))
-        self.screen.blit(self.title, (160, 0))
-        self.screen.blit(self.player1_img, (50, 210))
-        self.screen.blit(self.player2_img, (550, 220))
-        #Drawing button widgets
-        self.startBtn = Button(self.screen, (300, 200), 'Start', pad=15)
-        self.controlsBtn = Button(self.screen, (295, 275), 'Controls', pad=10)
-        self.quitBtn = Button(self.screen, (300, 350), 'Quit', pad=15)
-
-    def mainloop(self):
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    exitGame()
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                        exitGame()
-                [entryWidget.handle_event(event) for entryWidget in self.entryWidgets]
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if self.quitBtn.clicked():
-                        exitGame()
-                    elif self.startBtn.clicked():
-                        values = [e.val for e in self.entryWidgets]
-                        #Checking if values Exist
-                        if all(values):
-                            return
-                    elif self.controlsBtn.clicked():
-                        ControlScreen(self.screen, self.bg)
-                        self.displayUI()
-            self.displayUI()
-            for entryWidget in self.entryWidgets:
-                entryWidget.draw(self.screen)
-                entryWidget.update()
-            pygame.display.update()
-
-    def getPlayerNames(self):
-        return [e.val for e in self.entryWidgets]
-
-class PauseScreen:
-    def __init__(self, screen, bg):
-        self.screen = screen
-        self.bg = bg
-        self.title = pygame.image.load(resourcePath('paused.png'))
-        self.player1_img = pygame.image.load(resourcePath('Player1.png', subdir='Player 1'))
-        self.player2_img = pygame.image.load(resourcePath('Player2.png', subdir='Player 2'))
-        self.font = pygame.font.SysFont('Garamond', 50)
-        self.reset = False
-        self.displayUI()
-        self.mainloop()
-
-    def displayUI(self):
-        self.screen.blit(self.bg, (0, 0))
-        self.screen.blit(self.title, (300, 40))
-        self.screen.blit(self.player1_img, (50, 210))
-        self.screen.blit(self.player2_img, (550, 220))
-        self.resumeBtn = Button(self.screen, (320, 150), 'Resume', pad=10)
-        self.resetBtn = Button(self.screen, (320, 210), 'Reset', pad=14)
-        self.quitBtn = Button(self.screen, (320, 270), 'Quit', pad=15)
-        self.aboutBtn = Button(self.screen, (320, 330), 'About', pad=12)
-        self.aboutToggle = False
-
-    def mainloop(self):
-        while True:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    exitGame()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        exitGame()
-                    key_to_start = (event.key in [pygame.K_s, pygame.K_RETURN])
-                    if key_to_start:
-                        return
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if self.resumeBtn.clicked():
-                        return
-                    elif self.resetBtn.clicked():
-                        self.reset = True
-                        return
-                    elif self.aboutBtn.clicked():
-                        if self.aboutToggle:
-                            text_render = self.font.render('Created By: Sanvit Katrekar', 1, (255, 0, 0))
-                            self.screen.blit(text_render, (150, 400))
-                        else:
-                            self.displayUI()
-                        self.aboutToggle = not self.aboutToggle
-                    elif self.quitBtn.clicked():
-                        exitGame()
-                        
-            pygame.display.update()
-
-game = pygame.display.set_mode((850,480))
-pygame.display.set_caption('Jumping Game')
-pygame.display.set_icon(pygame.image.load(resourcePath('gameIcon.png')))
-
-a = True
-b = False
-
-alive1 = alive2 = True
-
-bg = pygame.image.load(resourcePath('bg.jpg'))
-gameLogo = pygame.image.load(resourcePath('gameLogo.png'))
-
-walkRight = [pygame.image.load(resourcePath('R1.png', subdir='Player 1')),
-             pygame.image.load(resourcePath('R2.png', subdir='Player 1')),
-             pygame.image.load(resourcePath('R3.png', subdir='Player 1')),
-             pygame.image.load(resourcePath('R4.png', subdir='Player 1')),
-             pygame.image.load(resourcePath('R5.png', subdir='Player 1')),
-             pygame.image.load(resourcePath('R6.png', subdir='Player 1')),
-             pygame.image.load(resourcePath('R7.png', subdir='Player 1')),
-             pygame.image.load(resourcePath('R8.png', subdir='Player 1')),
-             pygame.image.load(resourcePath('R9.png', subdir='Player 1'))]
-
-walkLeft = [pygame.image.load(resourcePath('L1.png', subdir='Player 1')),
-            pygame.image.load(resourcePath('L2.png', subdir='Player 1')),
-            pygame.image.load(resourcePath('L3.png', subdir='Player 1')),
-            pygame.image.load(resourcePath('L4.png', subdir='Player 1')),
-            pygame.image.load(resourcePath('L5.png', subdir='Player 1')),
-            pygame.image.load(resourcePath('L6.png', subdir='Player 1')),
-            pygame.image.load(resourcePath('L7.png', subdir='Player 1')),
-            pygame.image.load(resourcePath('L8.png', subdir='Player 1')),
-            pygame.image.load(resourcePath('L9.png', subdir='Player 1'))]
-
-Walkleft = [pygame.image.load(resourcePath('L1E.png', subdir='Player 2')),
-            pygame.image.load(resourcePath('L2E.png', subdir='Player 2')),
-            pygame.image.load(resourcePath('L3E.png', subdir='Player 2')),
-            pygame.image.load(resourcePath('L4E.png', subdir='Player 2')),
-            pygame.image.load(resourcePath('L5E.png', subdir='Player 2')),
-            pygame.image.load(resourcePath('L6E.png', subdir='Player 2')),
-            pygame.image.load(resourcePath('L7E.png', subdir='Player 2'))]
-
-Walkright = [pygame.image.load(resourcePath('R1E.png', subdir='Player 2')),
-             pygame.image.load(resourcePath('R2E.png', subdir='Player 2')),
-             pygame.image.load(resourcePath('R3E.png', subdir='Player 2')),
-             pygame.image.load(resourcePath('R4E.png', subdir='Player 2')),
-             pygame.image.load(resourcePath('R5E.png', subdir='Player 2')),
-             pygame.image.load(resourcePath('R6E.png', subdir='Player 2')),
-             pygame.image.load(resourcePath('R7E.png', subdir='Player 2'))]
-
-punchleft=[pygame.image.load(resourcePath('L8E.png', subdir='Player 2')),
-           pygame.image.load(resourcePath('L9E.png', subdir='Player 2')),
-           pygame.image.load(resourcePath('L10E.png', subdir='Player 2')),
-           pygame.image.load(resourcePath('L11E.png', subdir='Player 2'))]
-
-punchright=[pygame.image.load(resourcePath('R8E.png', subdir='Player 2')),
-            pygame.image.load(resourcePath('R9E.png', subdir='Player 2')),
-            pygame.image.load(resourcePath('R10E.png', subdir='Player 2')),
-            pygame.image.load(resourcePath('R11E.png', subdir='Player 2'))]
-
-#player1, player2 = 'Sanvit', 'Tanaya'
-player1, player2 = MenuScreen(game, bg, gameLogo).getPlayerNames()
-
-score = 0
-
-x1 = 50#Coordinates
-y1 = 400
-width1 = 40
-height1 = 60
-speed1 = 5#Speed of the character1
-health1 = 10
-damage1 = 2
-
-x2 = 725
-y2 = 400
-width2 = 40
-height2 = 60
-speed2 = 6
-health2 = 15
-damage2 = 1
-
-shootLoop = 0
-
-run = True
-t = 0
-
-count = count2 = 0
-
-jumpcount = jumpcount2 = 10#JUMP variables
-isJump = isJump2 = False
-walkcount = w2 = 0
-punch = False
-
-GAME_RESET = False
-
-isFly = isFly2 = False#FLY variables
-
-left = left2 = False#Loading images for moving left
-right = right2 = False#Loading images for moving right
-
-class Projectile:
-   def __init__(self,x,y,radius,colour,facing):
-      self.x = x
-      self.y = y
-      self.radius = radius
-      self.colour = colour
-      self.facing = facing
-      self.vel = 10 * facing
-      
-   def draw(self,game):
-      pygame.draw.circle(game ,self.colour, (self.x,self.y), self.radius, 1)
-
-clock = pygame.time.Clock()#Initializing clock
-
-playAgainBtn = None
-def redrawgame():#Main drawing fuction of game
-    global walkcount,w2,a,b,punch,t,left2,right2,score, pauseBtn, playAgainBtn
-
-    game.blit(bg,(0,0))
-
-    pauseBtn = Button(game, (340, 20), 'Pause', pad=2)
-    
-    text1 = font.render(str(player1) + "'s Health: " + str(health1), 1, (0,0,0))
-    game.blit(text1, (10,10))
-    
-    text2 = font.render(str(player2) + "'s Health: " + str(health2), 1, (0,0,0))
-    game.blit(text2, (550,10))
-    if not alive1:
-          win_text2 = font.render(str(player2) + ' Wins! Congratulations!', 1, (0,0,0))
-          game.blit(win_text2, (250, 100))
-       
-    elif not alive2:
-          win_text1 = font.render(str(player1) + ' Wins! Congratulations!', 1, (0,0,0))
-          game.blit(win_text1, (250, 100))
-
-    if not all([alive1, alive2]):
-        playAgainBtn = Button(game, (310, 150), 'Play Again', pad=2)
-    
-    if alive1:
-       if walkcount+1 > 27:
-           walkcount = 0
-         
-       if left:  
-           game.blit(walkLeft[walkcount//3], (x1,y1))#LOADING WALKING LEFT IMAGES
-           walkcount += 1
-           b = True
-       elif right:
-           game.blit(walkRight[walkcount//3], (x1,y1))#LOADING WALKING RIGHT IMAGES
-           walkcount += 1
-           b = False
-       else:
-          if b:
-             game.blit(walkLeft[0], (x1, y1))#LOADING THE IDLE IMAGE
-          else:
-             game.blit(walkRight[0], (x1,y1))
-
-       pygame.draw.rect(game, (255,0,0), (x1 + 10, y1 - 10, 50, 10))
-       pygame.draw.rect(game, (0,128,0), (x1 + 10, y1 - 10, 50 - (5 * (10 - health1)), 10))
-
-    if alive2:
-
-       if w2+1 > 21:
-           w2=0
-       if t+1 > 12:
-           t = 0
-           punch = False
-           
-       if punch:
-           if a:
-              game.blit(punchleft[t//4],(x2,y2))
-           else:
-              game.blit(punchright[t//4],(x2,y2))
-           t+=1
-           
-       elif left2:  
-           #LOADING WALKING LEFT IMAGES
-           game.blit(Walkleft[w2//3], (x2,y2))
-           w2 += 1
-           a = True
-       elif right2:
-           #LOADING WALKING RIGHT IMAGES
-           game.blit(Walkright[w2//3], (x2,y2))
-           w2 += 1
-           a=False
-           
-       else:
-           if a: game.blit(Walkleft[6],(x2,y2))
-           else: game.blit(Walkright[6],(x2,y2))
-
-       pygame.draw.rect(game, (255,0,0), (x2 + 20, y2 - 15, 60, 10))
-       pygame.draw.rect(game, (0,128,0), (x2 + 20, y2 - 15, 60 - (4 * (15 - health2)), 10))
-
-    for bullet in bullets: bullet.draw(game)
-        
-    pygame.display.update()#Updates the screen
-#MAINLOOP STARTS HERE
-font = pygame.font.SysFont('comicsans', 30, True)
-bullets = []
-while run:
-
-    if not(alive1 and alive2):
-       if count==0: #to ensure it only runs once in the loop
-          pygame.mixer.music.stop()
-          pygame.mixer.music.load(resourcePath('Shaabaashiyaan.mp3'))
-          pygame.mixer.music.set_volume(0.5)
-          pygame.mixer.music.play(-1)
-          count+=1
-    else:
-       if count2==0:
-          pygame.mixer.music.load(resourcePath('music.mp3'))
-          pygame.mixer.music.set_volume(0.5)
-          pygame.mixer.music.play(-1)
-          count2+=1
-          
-    clock.tick(27)#Frames Per Second
-
-    if health1<=0:
-       alive1 = False
-       x1,y1=0,0
-    elif health2<=0:
-       alive2 = False
-       x2,y2=0,0
-
-    if shootLoop > 0:
-       shootLoop += 1
-    if shootLoop > 7:
-       shootLoop = 0
-       
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            run=False
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if pauseBtn.clicked():
-                GAME_RESET = True if PauseScreen(game, bg).reset else False
-            elif playAgainBtn and playAgainBtn.clicked():
+                    run=False
+                elif bots and (event.type == pygame.MOUSEBUTTONDOWN or event.type == pygame.KEYDOWN and event.key != pygame.K_F3):
+                    restart('player')
+                elif event.type == pygame.MOUSEBUTTONDOWN and playback is None:
+                    if pauseBtn.clicked():
+                        GAME_RESET = True if scenes.run(PauseScreen(game, bg)) else False
+                        resetFrom = 'pause'
+                        renderer.invalidate()
+                        timestep.reset()
+                        frameProfiler.begin()#Time spent paused isn't frame time
+                    elif playAgainBtn and playAgainBtn.clicked():
+                        GAME_RESET = True
+                        resetFrom = 'playAgain'
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    overlay.toggle()
+
+            if bots and bots.over(state):#On to the next match the way the Play Again button does it
                 GAME_RESET = True
+                resetFrom = 'playAgain'
+            elif playback is None and bots is None:
+                keys=pygame.key.get_pressed()#Getting the input from keyboard
+                if keys[pygame.K_SPACE]: #Pause screen
+                    if scenes.run(PauseScreen(game, bg)):
+                        GAME_RESET = True
+                        resetFrom = 'pause'
+                    renderer.invalidate()
+                    timestep.reset()
+                    frameProfiler.begin()
+                keyInputs = readInputs(keys, layouts)
+            frameProfiler.mark('input')
+
+            tickStart = time.perf_counter()
+            #The computer thinks only as long as this frame can spare, catch up ticks get less
+            deadline = tickStart + 1.0/engine.TICK_RATE - drawTime - 0.004
+            for tick in range(timestep.advance()):
+                if bots:
+                    frameProfiler.mark('input')
+                    inputs = bots.inputs(state, deadline)
+                    frameProfiler.mark('ai')
+                    if GAME_RESET:
+                        inputs = (inputs[0] | engine.RESET, inputs[1])
+                elif playback is None:
+                    inputs = keyInputs
+                    if GAME_RESET:
+                        inputs = (inputs[0] | engine.RESET, inputs[1])
+                    if session:#Either layout drives this machine's player, the peer sends the other
+                        local = inputs[0] | inputs[1]
+                        inputs = (local, 0) if session.player == 1 else (0, local)
+                    if planner:
+                        frameProfiler.mark('input')
+                        cpu = planner.choose(state, inputs[2 - args.cpu], deadline)
+                        frameProfiler.mark('ai')
+                        if args.cpu == 1:
+                            inputs = (cpu | (inputs[0] & engine.RESET), inputs[1])
+                        else:
+                            inputs = (inputs[0], cpu | (inputs[1] & engine.RESET))
+                else:
+                    inputs = next(playback, None)
+                    if inputs is None:#End of the recording
+                        run = False
+                        break
+
+                if recorder:
+                    recorder.record(inputs)
+                previous = positions(state)
+                if session:
+                    if not session.advance(inputs[session.player - 1], frameProfiler):
+                        continue#Waiting for the peer, the input is dropped and a RESET will be sent again
+                else:
+                    engine.step(state, inputs, frameProfiler)
+
+                if (inputs[0] | inputs[1]) & engine.RESET:#Restart, the match state itself is reset by the engine
+                    audio.play('gameplay', restart=True)
+                    if eventLog:
+                        eventLog.reset(resetFrom if GAME_RESET else 'key')
+
+                    GAME_RESET = False
+                if eventLog:#Over --net this includes predicted ticks that may be rolled back
+                    eventLog.observe(state)
+            drawStart = time.perf_counter()
+            redrawgame(timestep.alpha())
+            drawTime = max(time.perf_counter() - drawStart, drawTime*0.95)
+            frameProfiler.end()
+            if eventLog:
+                eventLog.frame(time.perf_counter() - frameProfiler.start)
+            tripped = watchdog and watchdog.frame()
+            if tripped:
+                reason, measured = tripped
+                if reason == 'memory':
+                    measured /= 2**20
+                restart(reason, measured)
+    except Exception:
+        #Reload with --load-state to look at the match as it was
+        path = 'crash-%d.jgstate' % state.ticks
+        with open(path, 'wb') as f:
+            f.write(state.snapshot())
+        print('Game state saved to', path)
+        raise
+    if recorder:
+        recorder.close()
+    if eventLog:
+        eventLog.close()
+    pygame.quit()
 
-    for bullet in bullets:
-       if bullet.y - bullet.radius < y2 + height2 and bullet.y + bullet.radius > y2:
-          if bullet.x + bullet.radius > x2 and bullet.x - bullet.radius < x2 + width2:
-             bullets.pop(bullets.index(bullet))
-             health2 -= damage1
-             if health2<0: health2=0
-             isJump2 = True
-             
-       if 0 < bullet.x < 850: bullet.x+=bullet.vel
-       else: bullets.pop(bullets.index(bullet))
-        
-    keys=pygame.key.get_pressed()#Getting the input from keyboard
-
-    if keys[pygame.K_q] and shootLoop == 0:
-       if b: facing = -1
-       else: facing = 1
-       
-       if len(bullets) < 2:
-          bullets.append(Projectile(round(x1 + width1//2), round(y1 + height1//2), 6, (0,0,0),facing))
-
-       shootLoop = 1
-
-    if keys[pygame.K_SPACE]: #Pause screen
-        if PauseScreen(game, bg).reset:
-            GAME_RESET = True
-                
-    elif keys[pygame.K_a] and x1>speed1 and (not(x2<x1<x2+width2) or isJump==True or isJump2):#Walking Left
-        x1-=speed1
-        left=True
-        right=False
-        
-    elif keys[pygame.K_d] and x1<838-width1-speed1 and (not(x2-width2<x1<x2) or isJump==True or isJump):#Walkding Right
-        x1+=speed1
-        left=False
-        right=True
-        
-    else:#Standing Idle
-        left=False
-        right=False
-        walkcount=0
-        
-    if keys[pygame.K_p]: #Punching player
-        punch=True
-        if x2-width2<x1<x2+width2 and not(isJump) and y2<=y1<=y2+height2:
-            isJump=True
-            health1 -= damage2
-            if health1<0: health=0
-    elif keys[pygame.K_j] and x2>speed2 and (not(x1<x2<x1+width1)or isJump2==True or isJump): #Walking left
-        x2-=speed2
-        left2=True
-        right2=False
-    elif keys[pygame.K_l] and x2<838-width2-speed2 and (not(x1-width1<x2<x1) or isJump2==True or isJump):#Walking Right
-        x2+=speed2
-        left2=False
-        right2=True
-    elif keys[pygame.K_SLASH]: #Hack
-        speed2 += 1
-        damage2 += 1
-    elif keys[pygame.K_PERIOD]: #Unhack
-        speed2 = 6
-        damage2 = 1
-        
-    else:#Standing Idle
-        left2=False
-        right2=False
-        w2=0
-    if keys[pygame.K_r]:#Restart, setting all variables to False
-        GAME_RESET = True
-
-    if GAME_RESET:
-        x1,y1=50,400
-        isFly=False
-        isJump=False
-        left=False
-        right=False
-        health1=10
-        
-        x2,y2=725,400
-        isFly2=False
-        isJump2=False
-        left2=False
-        right2=False
-        health2=15
-        speed2 = 6
-
-        alive1 = alive2 = True
-        
-        pygame.mixer.music.stop()
-        count=count2=0
-
-        GAME_RESET = False
-        playAgainBtn = None
-            
-    if not isFly:#Enable FLYING
-        if keys[pygame.K_f]:
-            isFly=True
-    else:#Main Flying Loop
-            if keys[pygame.K_w] and y1>0:
-                y1-=speed1
-            elif keys[pygame.K_s] and y1<480-height1-speed1:
-                y1+=speed1
-            elif keys[pygame.K_x]:#Disabling FLYING
-                isFly=False
-    if not isJump:#Enable JUMP
-     if keys[pygame.K_w]:
-         isJump=True
-    else:#Main Jump loop
-        if jumpcount>=-10:
-            if jumpcount<0:
-              negative=-1
-            else:
-                negative=1
-            y1-=((jumpcount**2)//3)*negative
-            jumpcount-=1
-        else:
-            isJump=False
-            jumpcount=10
-    if not isJump2:#Enable JUMP
-     if keys[pygame.K_i]:
-         isJump2=True
-    else:#Main Jump loop
-        if jumpcount2>=-10:
-            if jumpcount2<0:
-              negative=-1
-            else:
-                negative=1
-            y2-=((jumpcount2**2)//3)*negative
-            jumpcount2-=1
-        else:
-            isJump2=False
-            jumpcount2=10
-            
-    if not isFly2:#Enable FLYING
-        if keys[pygame.K_g]:
-            isFly2=True
-    else:#Main Flying Loop character 2
-            if keys[pygame.K_i] and y2>0:
-                y2-=speed2
-            elif keys[pygame.K_k] and y2<480-height2-speed2:
-                y2+=speed2
-            elif keys[pygame.K_n]:#Disabling FLYING
-                isFly2=False
-    redrawgame()
-pygame.quit()
+if __name__ == '__main__':
+    main()
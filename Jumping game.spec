@@ -1,12 +1,27 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+import os
+import sys
+
+sys.path.insert(0, SPECPATH)
+import assets
+import config
+
 block_cipher = None
 
+#Images go in as one pre-decoded bundle, unpacked as a single file on each launch
+bundle = os.path.join(SPECPATH, 'build', assets.BUNDLE)
+os.makedirs(os.path.dirname(bundle), exist_ok=True)
+os.chdir(SPECPATH)
+assets.pack(bundle, assets.sourceFiles())
+#game.json ships with its compiled cache, so the first launch doesn't parse it either
+gameData = config.dataPath(config.GAME)
+config.load()
 
 a = Analysis(['Jumping game.py'],
              pathex=['C:\\Users\\katre\\Desktop\\Python Projects\\Game Jump'],
              binaries=[],
-             datas=[('Images/*.png', '.'), ('Images/bg.jpg', '.'), ('Images/Player 1/*.png', '.'), ('Images/Player 2/*.png', '.'), ('Text Files/controls.txt', '.'), ('Music/*.mp3', '.')],
+             datas=[(bundle, '.'), (gameData, '.'), (config.cachePath(gameData), '__pycache__'), ('Music/*.mp3', '.')],
              hiddenimports=[],
              hookspath=[],
              runtime_hooks=[],
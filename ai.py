@@ -0,0 +1,195 @@
+''' CPU opponent that plans by simulating the engine ahead, within a time budget per tick
+
+Each tick the planner tries every action in its repertoire, held for HOLD
+ticks, then every follow up action, and so on, scoring where each line ends
+up. It deepens one ply at a time until the deadline and plays the best first
+action of the deepest search it finished, so a faster machine just looks
+further ahead. Positions are cached by their snapshot, which also catches
+actions that do the same thing (jumping while already in the air, shooting
+during the cooldown) and lines from the last tick's search.
+
+Like runner.py it only needs engine. Watch it play the chase bot:
+
+    python ai.py --player 2 --budget 8
+'''
+import argparse
+import gc
+import struct
+import time
+
+import engine
+from engine import LEFT, RIGHT, UP, LAND, ATTACK
+
+HOLD = 3#Ticks each action is held for during the search
+ACTIONS = (0, ATTACK, LEFT, RIGHT, UP, LEFT | UP, RIGHT | UP, LAND)
+WIN = 10**6
+
+class OutOfTime(Exception):
+    pass
+
+def actions(p):
+    ''' ACTIONS that can make a difference to p right now, the rest act like pressing nothing '''
+    found = []
+    for action in ACTIONS:
+        if action & UP and p.isJump and not p.isFly:
+            continue
+        if action & LAND and not p.isFly:
+            continue
+        if action == ATTACK and not p.fist and p.shootLoop:
+            continue
+        found.append(action)
+    return found
+
+def stateKey(s):
+    ''' Snapshot without the tick count, equal states found on different ticks share a key '''
+    data = s.snapshot()
+    return data[:1] + data[1 + 4:]
+
+def evaluate(s, me, them):
+    ''' Score of s for player me, health first then a position to attack from '''
+    if not them.alive or them.health <= 0:
+        return WIN
+    if not me.alive or me.health <= 0:
+        return -WIN
+    score = 100*(me.health - them.health)
+    gap = them.x - me.x
+    if me.fist:#Get close and level with them
+        score -= abs(gap)//10 + abs(them.y - me.y)//5
+    else:#Face them at shooting height, not too close to be punched
+        score -= abs(them.y - me.y)//5
+        if (gap < 0) == me.facingLeft: score += 20
+        if abs(gap) < 3*me.width: score -= 30
+    return score
+
+class Planner:
+    ''' Chooses player's key mask each tick, player being 1 or 2
+
+    budget is the seconds one choose() may take at most, the caller can pass
+    a tighter absolute deadline when the frame has less time to spare. The
+    garbage collector is off while it searches, a full collection can take
+    longer than the whole budget.
+    '''
+    def __init__(self, player, budget=0.008, maxDepth=8, tableSize=50000, clock=time.perf_counter):
+        self.player = player
+        self.budget = budget
+        self.maxDepth = maxDepth
+        self.tableSize = tableSize
+        self.clock = clock
+        #Position cache, direct mapped: a position goes in the slot its key hashes to, replacing what
+        #was there. Unlike a dict it never resizes, which mid search took longer than the budget
+        self.keys = [None]*tableSize
+        self.values = [0]*tableSize
+        self.scratch = engine.GameState()#Searched in place of the real match
+        self.deadline = 0.0
+        self.opponent = 0
+        self.depth = 0#Deepest finished search of the last choose()
+        self.hits = self.nodes = 0
+
+    def inputs(self, action):
+        return (action, self.opponent) if self.player == 1 else (self.opponent, action)
+
+    def search(self, depth):
+        ''' Best value reachable from the scratch state in depth plies, leaves it unchanged '''
+        s = self.scratch
+        #The opponent's held mask changes what a position is worth, so it is part of the key.
+        #Bytes keys aren't tracked by the garbage collector, tuples would be
+        key = stateKey(s) + struct.pack('<HB', self.opponent, depth)
+        slot = hash(key) % self.tableSize
+        if self.keys[slot] == key:
+            self.hits += 1
+            return self.values[slot]
+        if self.clock() > self.deadline:
+            raise OutOfTime
+        self.nodes += 1
+        me, them = (s.p1, s.p2) if self.player == 1 else (s.p2, s.p1)
+        if depth == 0 or s.winner() is not None:
+            value = evaluate(s, me, them)
+        else:
+            start = s.snapshot()
+            value = -WIN - 1
+            for action in actions(me):
+                if self.clock() > self.deadline:
+                    raise OutOfTime
+                for _ in range(HOLD):
+                    engine.step(s, self.inputs(action))
+                value = max(value, self.search(depth - 1))
+                s.restore(start)
+        self.keys[slot] = key
+        self.values[slot] = value
+        return value
+
+    def choose(self, s, opponent=0, deadline=None):
+        ''' Key mask for this tick, opponent is assumed to keep pressing the keys they pressed last '''
+        collecting = gc.isenabled()
+        gc.disable()#Searching makes next to no cycles, what there is waits for the next collection after
+        self.deadline = min(deadline or float('inf'), self.clock() + self.budget)
+        self.opponent = opponent & ~engine.RESET
+        self.depth = 0
+        start = s.snapshot()
+        choices = actions(s.players[self.player - 1])
+        best = None
+        try:
+            for depth in range(1, self.maxDepth + 1):
+                scores = []
+                for action in choices:
+                    if self.clock() > self.deadline:
+                        raise OutOfTime
+                    self.scratch.restore(start)
+                    for _ in range(HOLD):
+                        engine.step(self.scratch, self.inputs(action))
+                    scores.append(self.search(depth - 1))
+                best = choices[scores.index(max(scores))]
+                self.depth = depth
+                if max(scores) >= WIN:
+                    break#A sure win, looking further won't find a better one
+        except OutOfTime:
+            pass
+        finally:
+            if collecting:
+                gc.enable()
+        if best is None:#Not even one ply fit in the time, react instead
+            best = self.reflex(s)
+        return best
+
+    def reflex(self, s):
+        ''' Cheap move toward the opponent, for ticks with no time to plan '''
+        me, them = (s.p1, s.p2) if self.player == 1 else (s.p2, s.p1)
+        gap = them.x - me.x
+        towards = RIGHT if gap > 0 else LEFT
+        if me.fist:
+            return ATTACK if abs(gap) < me.width else towards
+        return ATTACK if (gap < 0) == me.facingLeft else towards
+
+def selfTest(args):
+    ''' Plays the planner against runner's chase bot, reporting how long choose() took '''
+    import random
+    from runner import chasePolicy
+    rng = random.Random(args.seed)
+    planner = Planner(args.player, args.budget/1000.0)
+    s = engine.GameState()
+    times, depths = [], []
+    opponent = 0
+    while s.winner() is None and s.ticks < args.ticks:
+        start = time.perf_counter()
+        mine = planner.choose(s, opponent)
+        times.append(time.perf_counter() - start)
+        depths.append(planner.depth)
+        opponent = chasePolicy(s, 3 - args.player, rng)
+        engine.step(s, (mine, opponent) if args.player == 1 else (opponent, mine))
+    times.sort()
+    print('winner %s after %d ticks, health %d/%d' % (s.winner(), s.ticks, s.p1.health, s.p2.health))
+    print('choose ms: p50 %.2f p99 %.2f max %.2f, budget %.2f' % (
+        times[len(times)//2]*1000, times[int(len(times)*0.99)]*1000, times[-1]*1000, args.budget))
+    print('depth: mean %.1f min %d max %d, cache hits %d nodes %d' % (
+        sum(depths)/len(depths), min(depths), max(depths), planner.hits, planner.nodes))
+
+def main():
+    parser = argparse.ArgumentParser(description='Lookahead CPU player against the chase bot')
+    parser.add_argument('--player', type=int, choices=(1, 2), default=2, help='player the planner controls')
+    parser.add_argument('--budget', type=float, default=8.0, help='ms per tick')
+    parser.add_argument('--ticks', type=int, default=engine.TICK_RATE*120)
+    parser.add_argument('--seed', type=int, default=0)
+    selfTest(parser.parse_args())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+''' Which sprite each fighter shows, looked up from frame schedules made once per character
+
+The engine only keeps counters (walkcount, punchcount, jumpcount). A fighter
+is in one of the states below, and every state and facing of a character has
+a schedule, a tuple with one frame per value of that state's counter, so the
+frame to draw is one index instead of a chain of ifs and divisions. States a
+character has no frames for show its standing frame.
+'''
+from engine import WALK_TICKS, PUNCH_TICKS
+
+IDLE, WALK, PUNCH, JUMP, FLY = range(5)
+JUMP_TICKS = 22#jumpcount runs from 10 down to -11 over one jump
+
+def state(p):
+    ''' p's animation state, what it is doing that shows most '''
+    if p.punch:
+        return PUNCH
+    if p.left or p.right:
+        return WALK
+    if p.isFly:
+        return FLY
+    if p.isJump:
+        return JUMP
+    return IDLE
+
+def counter(p, kind, ticks):
+    ''' Index into kind's schedule for p, ticks drives the looping fly frames '''
+    if kind == WALK:
+        return p.walkcount
+    if kind == PUNCH:
+        return p.punchcount
+    if kind == JUMP:
+        return 10 - p.jumpcount
+    if kind == FLY:
+        return ticks
+    return 0
+
+def steps(frames, ticks, length):
+    ''' Schedule for a counter that is bumped before drawing, each frame held for ticks '''
+    return tuple(frames[min(max(0, i - 1)//ticks, len(frames) - 1)] for i in range(length + 1))
+
+class Animation:
+    ''' Frame schedules of one game.json character, frames maps walkLeft and the like to surfaces '''
+    def __init__(self, c, frames):
+        self.schedules = {}#(state, facingLeft) -> frames by counter
+        for facingLeft, side in ((True, 'Left'), (False, 'Right')):
+            walk = frames['walk' + side]
+            stand = (walk[c['standFrame']],)
+            punch, jump, fly = frames.get('punch' + side), frames.get('jump' + side), frames.get('fly' + side)
+            self.schedules[IDLE, facingLeft] = stand
+            self.schedules[WALK, facingLeft] = steps(walk, WALK_TICKS, WALK_TICKS*len(walk))
+            self.schedules[PUNCH, facingLeft] = steps(punch, PUNCH_TICKS, c['punchTicks']) if punch else stand
+            self.schedules[JUMP, facingLeft] = tuple(jump[i*len(jump)//JUMP_TICKS] for i in range(JUMP_TICKS)) if jump else stand
+            self.schedules[FLY, facingLeft] = tuple(fly[i//WALK_TICKS] for i in range(WALK_TICKS*len(fly))) if fly else stand
+
+    def frames(self):
+        ''' Every surface this animation can show '''
+        return {image for schedule in self.schedules.values() for image in schedule}
+
+    def image(self, p, ticks=0):
+        ''' The surface to draw for p this tick '''
+        kind = state(p)
+        schedule = self.schedules[kind, p.facingLeft]
+        return schedule[counter(p, kind, ticks) % len(schedule)]
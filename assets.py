@@ -0,0 +1,201 @@
+''' Loads every image once, converted to the display format and shared by all screens
+
+Images can also come from one packed bundle, which is what the
+PyInstaller build ships. Its images are stored already decoded, so loading one
+is a view into the memory mapped file instead of a PNG decode. Build it with
+
+    python assets.py [FILE]
+
+When assets.jgpak is next to the game (or in the PyInstaller temp folder) it is
+used instead of the loose files, rebuild or delete it after changing them.
+'''
+import argparse
+import glob
+import io
+import mmap
+import os
+import posixpath
+import struct
+import sys
+
+import pygame
+
+BUNDLE = 'assets.jgpak'
+MAGIC = b'JGPK'
+HEADER = struct.Struct('<4sBI')#Magic, version, entry count
+ENTRY = struct.Struct('<IIHHBH')#Offset, size, width, height, kind, name length, then the name
+FILE, RGB, RGBA = 0, 1, 2#Entry kinds, raw file bytes or decoded pixels
+PIXELS = {RGB: 'RGB', RGBA: 'RGBA'}
+
+def resourcePath(relativePath, subdir=''):
+    ''' Get absolute path to resource, works for dev and for PyInstaller '''
+    try:
+        #PyInstaller creates a temp folder and stores path in _MEIPASS
+        basePath = sys._MEIPASS
+    except Exception:
+        relativePath = os.path.join(subdir, relativePath)
+        if relativePath.endswith('.mp3'):
+            #Music files
+            basePath = os.path.abspath('Music')
+        elif relativePath.endswith('.txt'):
+            #Text files
+            basePath = os.path.abspath('Text files')
+        else:
+            #Image files
+            basePath = os.path.abspath('Images')
+    return os.path.join(basePath, relativePath)
+
+def bundlePath():
+    return os.path.join(getattr(sys, '_MEIPASS', os.path.abspath('.')), BUNDLE)
+
+class Bundle:
+    ''' Read only index over a packed asset file, entries are named like 'Player 1/R1.png' '''
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != 1:
+            raise ValueError('%s is not an asset bundle' % path)
+        self.entries = {}#Name -> (offset, size, width, height, kind)
+        position = HEADER.size
+        for _ in range(count):
+            offset, size, width, height, kind, length = ENTRY.unpack_from(self.data, position)
+            position += ENTRY.size
+            name = bytes(self.data[position:position + length]).decode('utf-8')
+            position += length
+            self.entries[name] = (offset, size, width, height, kind)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def read(self, name):
+        offset, size, width, height, kind = self.entries[name]
+        return self.data[offset:offset + size]
+
+    def image(self, name):
+        ''' Surface straight over the mapped pixels, convert it before the next image is needed '''
+        offset, size, width, height, kind = self.entries[name]
+        if kind == FILE:
+            return pygame.image.load(io.BytesIO(self.data[offset:offset + size]), name)
+        return pygame.image.frombuffer(memoryview(self.data)[offset:offset + size], (width, height), PIXELS[kind])
+
+def pack(path, files):
+    ''' Writes {bundle name: file path} to a bundle at path, images are decoded first '''
+    index, blobs = [], []
+    offset = HEADER.size + sum(ENTRY.size + len(name.encode('utf-8')) for name in files)
+    for name, source in sorted(files.items()):
+        width = height = 0
+        kind = FILE
+        if source.lower().endswith(('.png', '.jpg')):
+            surface = pygame.image.load(source)
+            kind = RGBA if surface.get_flags() & pygame.SRCALPHA else RGB
+            width, height = surface.get_size()
+            blob = pygame.image.tobytes(surface, PIXELS[kind])
+        else:
+            with open(source, 'rb') as f:
+                blob = f.read()
+        index.append(ENTRY.pack(offset, len(blob), width, height, kind, len(name.encode('utf-8'))) + name.encode('utf-8'))
+        blobs.append(blob)
+        offset += len(blob)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, 1, len(index)))
+        f.writelines(index)
+        f.writelines(blobs)
+
+def sourceFiles():
+    ''' {bundle name: file path} of every image the game loads '''
+    files = {}
+    for pattern, root in (('Images/**/*.png', 'Images'), ('Images/**/*.jpg', 'Images')):
+        for source in glob.glob(pattern, recursive=True):
+            files[posixpath.join(*os.path.relpath(source, root).split(os.sep))] = source
+    return files
+
+def openBundle():
+    path = bundlePath()
+    return Bundle(path) if os.path.exists(path) else None
+
+bundle = openBundle()#None runs from the loose files
+
+def load(name, subdir=''):
+    ''' Unconverted image, from the bundle when there is one '''
+    key = posixpath.join(subdir, name) if subdir else name
+    if bundle and key in bundle:
+        return bundle.image(key)
+    return pygame.image.load(resourcePath(name, subdir))
+
+def convert(surface):
+    ''' Converts to the display pixel format so blits don't convert every frame '''
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
+
+def packAtlas(surfaces, maxWidth=1024):
+    ''' Packs surfaces into rows of one atlas surface, returns a subsurface view per surface '''
+    positions = []
+    x = y = rowHeight = width = 0
+    for surface in surfaces:
+        w, h = surface.get_size()
+        if x and x + w > maxWidth:
+            x, y = 0, y + rowHeight
+            rowHeight = 0
+        positions.append((x, y, w, h))
+        x += w
+        width = max(width, x)
+        rowHeight = max(rowHeight, h)
+    atlas = pygame.Surface((width, y + rowHeight), pygame.SRCALPHA).convert_alpha()
+    atlas.fill((0, 0, 0, 0))
+    for surface, rect in zip(surfaces, positions):
+        #Max blending onto the cleared atlas copies the pixels exactly
+        atlas.blit(surface, rect[:2], special_flags=pygame.BLEND_RGBA_MAX)
+    return atlas, [atlas.subsurface(rect) for rect in positions]
+
+class Assets:
+    ''' Image cache keyed on (subdir, name), needs the display mode set before use '''
+    def __init__(self):
+        self.images = {}
+        self.atlas = None
+
+    def image(self, name, subdir=''):
+        key = (subdir, name)
+        surface = self.images.get(key)
+        if surface is None:
+            surface = self.images[key] = convert(load(name, subdir))
+        return surface
+
+    def animations(self, frames, atlas=True):
+        ''' Loads {animation: (subdir, [file names])}, returns {animation: [surfaces]}
+
+        With atlas set every frame ends up as a subsurface of one shared atlas.
+        '''
+        loaded = {animation: [self.image(name, subdir) for name in names]
+                  for animation, (subdir, names) in frames.items()}
+        if atlas:
+            keys = [(subdir, name) for subdir, names in frames.values() for name in names]
+            keys = list(dict.fromkeys(keys))
+            self.atlas, views = packAtlas([self.images[key] for key in keys])
+            self.images.update(zip(keys, views))
+            loaded = {animation: [self.images[(subdir, name)] for name in names]
+                      for animation, (subdir, names) in frames.items()}
+        return loaded
+
+    def preload(self, images):
+        ''' Loads (name, subdir) pairs up front so screens never hit the disk '''
+        for name, subdir in images:
+            self.image(name, subdir)
+
+#Shared by every screen, needs the display mode set before the first load
+cache = Assets()
+image = cache.image
+preload = cache.preload
+animations = cache.animations
+
+def main():
+    parser = argparse.ArgumentParser(description='Packs the images into one bundle')
+    parser.add_argument('output', nargs='?', default=BUNDLE)
+    args = parser.parse_args()
+    files = sourceFiles()
+    pack(args.output, files)
+    print('%d files, %d bytes -> %s' % (len(files), os.path.getsize(args.output), args.output))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+''' Attract mode for unattended cabinets, the computer plays both sides match after match
+
+Bots drives both players with ai.Planner, now and then wandering off with a
+random move so no two matches play out the same, and says when a finished
+match has been shown long enough to start the next. Watchdog keeps an eye on
+the process's memory and frame rate, and restart() replaces the process with
+a fresh copy of the game when it trips or somebody walks up to play. Without
+--telemetry the reasons are appended to attract.log next to the game, a cabinet
+build has no console to print them to.
+'''
+import os
+import random
+import subprocess
+import sys
+import time
+
+import ai
+import engine
+
+class Bots:
+    ''' Key masks for both players, budget being the seconds both planners may take together each tick '''
+    def __init__(self, budget=0.008, wander=0.03, showTicks=engine.TICK_RATE*6,
+                 maxTicks=engine.TICK_RATE*120, tableSize=20000, rng=None, clock=time.perf_counter):
+        #Smaller position caches than a human's opponent gets, they are most of what attract mode holds
+        self.planners = [ai.Planner(number, budget/2, tableSize=tableSize, clock=clock) for number in (1, 2)]
+        self.wander = wander#Chance a tick starts a random move instead of a planned one
+        self.showTicks = showTicks#How long the winner is shown for
+        self.maxTicks = maxTicks#Longest a match may go on
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.last = [0, 0]#Each player's last key mask, what the other's planner expects them to keep pressing
+        self.held = [0, 0]#Ticks left of the random move each player is making
+        self.started = None#Tick the current match began on, resets keep the tick count going
+        self.ended = None#Tick it was decided on
+
+    def pick(self, i, s, deadline):
+        if self.held[i]:
+            self.held[i] -= 1
+        elif self.rng.random() < self.wander:
+            self.last[i] = self.rng.choice(ai.ACTIONS)
+            self.held[i] = ai.HOLD - 1
+        else:
+            self.last[i] = self.planners[i].choose(s, self.last[1 - i], deadline)
+        return self.last[i]
+
+    def inputs(self, s, deadline):
+        ''' Both players' masks for this tick, planned by deadline '''
+        half = self.clock() + (deadline - self.clock())/2
+        return (self.pick(0, s, half), self.pick(1, s, deadline))
+
+    def over(self, s):
+        ''' True once a finished match has been on screen for showTicks, or one has dragged on too long '''
+        if self.started is None:
+            self.started = s.ticks
+        if all(p.alive for p in s.players):
+            if self.ended is not None:#The last match has been reset
+                self.ended = None
+                self.started = s.ticks
+            if s.ticks - self.started >= self.maxTicks:
+                self.started = s.ticks
+                return True
+            return False
+        if self.ended is None:
+            self.ended = s.ticks
+        return s.ticks - self.ended >= self.showTicks
+
+def memoryUsed():
+    ''' Resident memory of this process in bytes, the peak where the current size can't be had '''
+    try:#Linux
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1])*os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if os.name == 'nt':
+        import ctypes
+        from ctypes import wintypes
+        class Counters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in ('PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage',
+                                                     'QuotaPagedPoolUsage', 'QuotaPeakNonPagedPoolUsage',
+                                                     'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')]
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        ctypes.windll.psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(Counters), wintypes.DWORD]
+        if ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                    ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return 0
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak*1024#Bytes on macOS, kilobytes elsewhere
+
+class Watchdog:
+    ''' Trips when the process holds more than maxBytes, or the frame rate stays under minFps
+
+    Both are measured every interval seconds, the frame rate has to be low
+    strikes times in a row so one slow moment, like a window drag, is let go.
+    '''
+    REASONS = ('memory', 'fps')
+
+    def __init__(self, maxBytes, minFps, interval=10.0, strikes=3, clock=time.perf_counter):
+        self.maxBytes = maxBytes
+        self.minFps = minFps
+        self.interval = interval
+        self.strikes = strikes
+        self.clock = clock
+        self.checked = clock()
+        self.frames = 0
+        self.slow = 0#Intervals in a row under minFps
+
+    def frame(self):
+        ''' Counts a drawn frame, returns (reason, measured) when a limit is broken, else None '''
+        self.frames += 1
+        now = self.clock()
+        if now - self.checked < self.interval:
+            return None
+        fps = self.frames/(now - self.checked)
+        self.frames = 0
+        self.checked = now
+        self.slow = self.slow + 1 if fps < self.minFps else 0
+        used = memoryUsed()
+        if used > self.maxBytes:
+            return ('memory', used)
+        if self.slow >= self.strikes:
+            return ('fps', fps)
+        return None
+
+LOG = 'attract.log'
+
+def log(message, name=LOG):
+    ''' Appends message to name next to the game with the time, quietly gives up when that can't be written '''
+    base = sys.executable if getattr(sys, 'frozen', False) else os.path.abspath(sys.argv[0])
+    try:
+        with open(os.path.join(os.path.dirname(base), name), 'a') as f:
+            f.write('%s %s\n' % (time.strftime('%Y-%m-%d %H:%M:%S'), message))
+    except OSError:
+        pass
+
+def restart(argv):
+    ''' Replaces this process with the game started afresh with the command line arguments argv '''
+    if getattr(sys, 'frozen', False):#PyInstaller build, the executable is the game
+        command = [sys.executable] + list(argv)
+    else:
+        command = [sys.executable, os.path.abspath(sys.argv[0])] + list(argv)
+    if sys.stdout:#None in a PyInstaller build without a console
+        sys.stdout.flush()
+    if sys.stderr:
+        sys.stderr.flush()
+    if os.name == 'nt':#execv there neither quotes the arguments nor keeps the process
+        subprocess.Popen(command)
+        sys.exit()
+    os.execv(command[0], command)
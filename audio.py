@@ -0,0 +1,91 @@
+''' Music cues decoded on a background thread and cross-faded without blocking the game loop '''
+import os
+import threading
+
+import pygame
+
+from assets import resourcePath
+
+class AudioManager:
+    ''' Plays one looping cue at a time out of {name: file name}
+
+    The mixer is opened and cues are decoded into pygame.mixer.Sound objects
+    by a background thread, so neither holds up the first frame.
+    Asking for a cue that is still decoding starts it from update() once it's
+    ready, and a cue whose file is missing or unreadable just plays silence.
+    With the SDL dummy audio driver, or no mixer at all, nothing is decoded.
+    '''
+    def __init__(self, cues, volume=0.5, fadeMs=600):
+        self.cues = cues
+        self.volume = volume
+        self.fadeMs = fadeMs
+        self.sounds = {}#Name -> Sound, or None when it couldn't be loaded
+        self.loading = set()
+        self.lock = threading.Lock()
+        self.current = self.wanted = None
+        self.channel = None
+        self.enabled = os.environ.get('SDL_AUDIODRIVER') != 'dummy'
+        self.mixerLock = threading.Lock()
+
+    def openMixer(self):
+        ''' Opens the audio device on first use, returns False if there isn't one '''
+        with self.mixerLock:
+            if self.enabled and not pygame.mixer.get_init():
+                try:
+                    pygame.mixer.init()
+                except pygame.error:
+                    self.enabled = False
+            return self.enabled
+
+    def preload(self, names=None):
+        ''' Starts decoding the cues (all of them by default) on a background thread '''
+        names = [name for name in (names or self.cues) if name not in self.loading]
+        if not self.enabled or not names:
+            return None
+        self.loading.update(names)
+        thread = threading.Thread(target=self.load, args=names, daemon=True)
+        thread.start()
+        return thread
+
+    def load(self, *names):
+        if not self.openMixer():
+            return
+        for name in names:
+            try:
+                sound = pygame.mixer.Sound(resourcePath(self.cues[name]))
+                sound.set_volume(self.volume)
+            except (KeyError, pygame.error, OSError):
+                sound = None
+            with self.lock:
+                self.sounds[name] = sound
+
+    def play(self, name, restart=False):
+        ''' Cross-fades to the named cue, does nothing if it's already playing '''
+        if name == self.wanted and not restart:
+            return
+        self.wanted = name
+        if restart:
+            self.current = None
+        self.preload([name])#Lazily, for cues that weren't preloaded
+        self.update()
+
+    def update(self):
+        ''' Starts the wanted cue once it has been decoded, call every frame '''
+        if not self.enabled or self.wanted == self.current:
+            return
+        with self.lock:
+            if self.wanted not in self.sounds:
+                return
+            sound = self.sounds[self.wanted]
+        if self.channel:
+            self.channel.fadeout(self.fadeMs)
+            self.channel = None
+        if sound:
+            self.channel = sound.play(loops=-1, fade_ms=self.fadeMs)
+        self.current = self.wanted
+
+    def stop(self):
+        if self.channel:
+            self.channel.fadeout(self.fadeMs)
+        self.channel = None
+        self.current = self.wanted = None
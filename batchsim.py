@@ -0,0 +1,285 @@
+''' Runs thousands of independent matches in lockstep for balance sweeps
+
+Every GameState variable that matters to the outcome becomes a NumPy array
+over matches and engine.step()'s rules are applied as array ops, so one tick
+of N matches costs about as much as a handful of Python ticks. Sprite
+counters aren't simulated, only player 1's facing which aims the bullets.
+Example, sweeping player 2's speed and damage:
+
+    python batchsim.py --matches 10000 --sweep speed2=5,6,7 --sweep damage2=1,2
+
+The policies are array versions of runner.py's, --check-policies plays both
+on the same positions and random numbers and reports any mask that differs.
+'''
+import argparse
+import itertools
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+import runner
+from engine import (LEFT, RIGHT, UP, DOWN, FLY, LAND, ATTACK, HACK, UNHACK,
+                    ARENA_WIDTH, ARENA_HEIGHT, FLOOR_RIGHT, TICK_RATE, GameState, statTarget)
+
+#Tunable stats and their engine defaults
+DEFAULTS = {name: getattr(*statTarget(GameState(), name)) for name in
+            ('speed1', 'speed2', 'health1', 'health2', 'damage1', 'damage2', 'shootCooldown')}
+MAX_BULLETS = 2#engine.step() won't spawn a third live bullet
+RADIUS = 6
+
+class BatchState:
+    ''' n matches, one array element each, all starting from the engine's opening position '''
+    def __init__(self, n, **params):
+        params = dict(DEFAULTS, **params)
+        def full(value, dtype=np.int32):
+            return np.full(n, value, dtype)
+        start = GameState()
+        self.n = n
+        self.params = params
+        self.x1, self.y1 = full(start.p1.x), full(start.p1.y)
+        self.x2, self.y2 = full(start.p2.x), full(start.p2.y)
+        self.width, self.height = start.p1.width, start.p1.height#Both players are the same size
+        self.speed1, self.speed2 = full(params['speed1']), full(params['speed2'])
+        self.health1, self.health2 = full(params['health1']), full(params['health2'])
+        self.damage1, self.damage2 = full(params['damage1']), full(params['damage2'])
+        self.shootCooldown = params['shootCooldown']
+        self.shootLoop = full(0)
+        self.jumpcount, self.jumpcount2 = full(10), full(10)
+        self.isJump, self.isJump2 = full(False, bool), full(False, bool)
+        self.isFly, self.isFly2 = full(False, bool), full(False, bool)
+        self.b = full(False, bool)#Player 1 faces left
+        self.bx = np.zeros((n, MAX_BULLETS), np.int32)
+        self.by = np.zeros((n, MAX_BULLETS), np.int32)
+        self.bvel = np.zeros((n, MAX_BULLETS), np.int32)
+        self.balive = np.zeros((n, MAX_BULLETS), bool)
+        self.done = full(False, bool)
+        self.winner = full(0, np.int8)#0 while running or for a draw
+        self.length = full(0)
+        self.shots = full(0)
+        self.ticks = 0
+
+def flying(active, isFly, keys, y, speed, height):
+    ''' One tick of the flying controls for one player, returns the new isFly '''
+    enable = active & ~isFly & (keys & FLY != 0)
+    fly = active & isFly
+    up = fly & (keys & UP != 0) & (y > 0)
+    down = fly & ~up & (keys & DOWN != 0) & (y < ARENA_HEIGHT - height - speed)
+    land = fly & ~up & ~down & (keys & LAND != 0)
+    y -= np.where(up, speed, 0)
+    y += np.where(down, speed, 0)
+    return (isFly | enable) & ~land
+
+def jumping(active, isJump, keys, jumpcount, y):
+    ''' One tick of the jump arc for one player, returns the new isJump '''
+    start = active & ~isJump & (keys & UP != 0)
+    jump = active & isJump
+    rising = jump & (jumpcount >= -10)
+    negative = np.where(jumpcount < 0, -1, 1)
+    y -= np.where(rising, (jumpcount**2)//3 * negative, 0)
+    jumpcount -= rising
+    landed = jump & ~rising
+    jumpcount[landed] = 10
+    return (isJump | start) & ~landed
+
+def step(bs, keys1, keys2):
+    ''' engine.step() for every unfinished match, keys are arrays of input masks '''
+    active = ~bs.done
+    w, h = bs.width, bs.height
+
+    #Deaths, the match is decided on the tick a player's health is found at zero
+    dead1 = active & (bs.health1 <= 0)
+    dead2 = active & ~dead1 & (bs.health2 <= 0)
+    ended = dead1 | dead2
+    bs.winner[dead1] = 2
+    bs.winner[dead2] = 1
+    bs.length[ended] = bs.ticks
+    bs.done |= ended
+    active &= ~ended
+
+    shootLoop = bs.shootLoop
+    shootLoop += active & (shootLoop > 0)
+    shootLoop[active & (shootLoop > bs.shootCooldown)] = 0
+
+    #Bullets against player 2, then culled and moved
+    x2, y2 = bs.x2[:, None], bs.y2[:, None]
+    live = bs.balive & active[:, None]
+    hit = (live & (bs.bx - RADIUS < x2 + w) & (bs.bx + RADIUS > x2)
+           & (bs.by - RADIUS < y2 + h) & (bs.by + RADIUS > y2))
+    hits = hit.sum(axis=1)
+    bs.health2 = np.where(hits > 0, np.maximum(bs.health2 - bs.damage1*hits, 0), bs.health2)
+    bs.isJump2 |= hits > 0
+    bs.balive &= ~hit
+    live = bs.balive & active[:, None]
+    bs.balive &= ~(live & ((bs.bx <= 0) | (bs.bx >= ARENA_WIDTH)))
+    bs.bx += np.where(bs.balive & active[:, None], bs.bvel, 0)
+
+    shoot = active & (keys1 & ATTACK != 0) & (shootLoop == 0)
+    spawn = np.flatnonzero(shoot & (bs.balive.sum(axis=1) < MAX_BULLETS))
+    slot = np.argmin(bs.balive[spawn], axis=1)
+    bs.bx[spawn, slot] = bs.x1[spawn] + w//2
+    bs.by[spawn, slot] = bs.y1[spawn] + h//2
+    bs.bvel[spawn, slot] = np.where(bs.b[spawn], -10, 10)
+    bs.balive[spawn, slot] = True
+    bs.shots[spawn] += 1
+    shootLoop[shoot] = 1
+
+    x1, x2 = bs.x1, bs.x2
+    left1 = (active & (keys1 & LEFT != 0) & (x1 > bs.speed1)
+             & (~((x2 < x1) & (x1 < x2 + w)) | bs.isJump | bs.isJump2))
+    right1 = (active & ~left1 & (keys1 & RIGHT != 0) & (x1 < FLOOR_RIGHT - w - bs.speed1)
+              & (~((x2 - w < x1) & (x1 < x2)) | bs.isJump | bs.isJump2))
+    x1 += np.where(right1, bs.speed1, 0) - np.where(left1, bs.speed1, 0)
+
+    punch = active & (keys2 & ATTACK != 0)
+    punched = (punch & (x2 - w < x1) & (x1 < x2 + w) & ~bs.isJump
+               & (bs.y2 <= bs.y1) & (bs.y1 <= bs.y2 + h))
+    bs.isJump |= punched
+    bs.health1 -= np.where(punched, bs.damage2, 0)
+    left2 = (active & ~punch & (keys2 & LEFT != 0) & (x2 > bs.speed2)
+             & (~((x1 < x2) & (x2 < x1 + w)) | bs.isJump2 | bs.isJump))
+    right2 = (active & ~punch & ~left2 & (keys2 & RIGHT != 0) & (x2 < FLOOR_RIGHT - w - bs.speed2)
+              & (~((x1 - w < x2) & (x2 < x1)) | bs.isJump2 | bs.isJump))
+    x2 += np.where(right2, bs.speed2, 0) - np.where(left2, bs.speed2, 0)
+    rest = active & ~punch & ~left2 & ~right2
+    hack = rest & (keys2 & HACK != 0)
+    unhack = rest & ~hack & (keys2 & UNHACK != 0)
+    bs.speed2 += hack
+    bs.damage2 += hack
+    bs.speed2[unhack] = DEFAULTS['speed2']
+    bs.damage2[unhack] = DEFAULTS['damage2']
+
+    bs.isFly = flying(active, bs.isFly, keys1, bs.y1, bs.speed1, h)
+    bs.isJump = jumping(active, bs.isJump, keys1, bs.jumpcount, bs.y1)
+    bs.isFly2 = flying(active, bs.isFly2, keys2, bs.y2, bs.speed2, h)
+    bs.isJump2 = jumping(active, bs.isJump2, keys2, bs.jumpcount2, bs.y2)
+
+    bs.b = np.where(left1, True, np.where(right1, False, bs.b))
+    bs.ticks += 1
+
+def randomPolicy(bs, player, rng, press=0.3):
+    ''' runner.randomPolicy() for every match at once '''
+    masks = np.zeros(bs.n, np.int32)
+    for bit in (LEFT, RIGHT, UP, DOWN, FLY, LAND, ATTACK):
+        masks |= np.where(rng.random(bs.n) < press, bit, 0)
+    return masks
+
+def chasePolicy(bs, player, rng):
+    ''' runner.chasePolicy() for every match at once '''
+    me, them = (bs.x1, bs.x2) if player == 1 else (bs.x2, bs.x1)
+    gap = them - me
+    masks = np.zeros(bs.n, np.int32)
+    if player == 1:
+        facingThem = np.where(gap < 0, bs.b, ~bs.b)
+        masks |= np.where(np.abs(gap) > 200, np.where(gap > 0, RIGHT, LEFT), 0)
+        masks |= np.where(facingThem, ATTACK, np.where(gap > 0, RIGHT, LEFT))
+        masks |= np.where(rng.random(bs.n) < 0.05, UP, 0)
+    else:
+        masks |= np.where(np.abs(gap) < bs.width, ATTACK, np.where(gap > 0, RIGHT, LEFT))
+        masks |= np.where(rng.random(bs.n) < 0.1, UP, 0)
+    return masks
+
+POLICIES = {'random': randomPolicy, 'chase': chasePolicy}
+
+class Draws:
+    ''' Random numbers shared by both versions of a policy
+
+    The array version's rng.random(n) draws and remembers an array, match(i)
+    is a scalar rng handing match i its element of each in the same order.
+    '''
+    def __init__(self, rng):
+        self.rng = rng
+        self.arrays = []
+
+    def random(self, n):
+        draws = self.rng.random(n)
+        self.arrays.append(draws)
+        return draws
+
+    def match(self, i):
+        return SimpleNamespace(random=iter([float(draws[i]) for draws in self.arrays]).__next__)
+
+def matchState(bs, i):
+    ''' GameState holding what the policies look at in match i '''
+    s = GameState()
+    s.p1.x, s.p1.y, s.p1.facingLeft = int(bs.x1[i]), int(bs.y1[i]), bool(bs.b[i])
+    s.p2.x, s.p2.y = int(bs.x2[i]), int(bs.y2[i])
+    return s
+
+def checkPolicies(n=64, ticks=200, seed=0):
+    ''' Masks where POLICIES and runner's scalar policies of the same name disagree, over n matches '''
+    rng = np.random.default_rng(seed)
+    bs = BatchState(n)
+    mismatches = 0
+    for _ in range(ticks):
+        states = [matchState(bs, i) for i in range(n)]
+        for name, policy in POLICIES.items():
+            for player in (1, 2):
+                draws = Draws(rng)
+                masks = policy(bs, player, draws)
+                for i, s in enumerate(states):
+                    mismatches += runner.POLICIES[name](s, player, draws.match(i)) != masks[i]
+        step(bs, chasePolicy(bs, 1, rng), randomPolicy(bs, 2, rng))
+    return mismatches
+
+def run(n, policy1, policy2, maxTicks=TICK_RATE*120, seed=0, **params):
+    ''' Plays n matches to the end or maxTicks, returns the finished BatchState '''
+    rng = np.random.default_rng(seed)
+    bs = BatchState(n, **params)
+    while bs.ticks < maxTicks and not bs.done.all():
+        step(bs, policy1(bs, 1, rng), policy2(bs, 2, rng))
+    bs.length[~bs.done] = bs.ticks
+    return bs
+
+def report(bs):
+    lengths = bs.length[bs.winner > 0]
+    return {'matches': bs.n,
+            'p1_win_rate': float(np.mean(bs.winner == 1)),
+            'p2_win_rate': float(np.mean(bs.winner == 2)),
+            'draw_rate': float(np.mean(bs.winner == 0)),
+            'mean_length': float(lengths.mean()) if lengths.size else None,
+            'median_length': float(np.median(lengths)) if lengths.size else None,
+            'mean_shots': float(bs.shots.mean())}
+
+def parseSweep(text):
+    name, values = text.split('=', 1)
+    if name not in DEFAULTS:
+        raise argparse.ArgumentTypeError('%s is not one of %s' % (name, ', '.join(DEFAULTS)))
+    return name, [int(value) for value in values.split(',')]
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch match simulator for balance sweeps')
+    parser.add_argument('--matches', type=int, default=10000, help='matches per parameter set')
+    parser.add_argument('--max-ticks', type=int, default=TICK_RATE*120, help='draw after this many ticks')
+    parser.add_argument('--policy1', choices=POLICIES, default='chase')
+    parser.add_argument('--policy2', choices=POLICIES, default='chase')
+    parser.add_argument('--sweep', type=parseSweep, action='append', default=[], metavar='STAT=V1,V2',
+                        help='values to try for one of %s' % ', '.join(DEFAULTS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print one JSON line per parameter set')
+    parser.add_argument('--check-policies', action='store_true', help="compare the policies with runner.py's and exit")
+    args = parser.parse_args()
+    if args.check_policies:
+        mismatches = checkPolicies(seed=args.seed)
+        print('%d masks differ from runner.py' % mismatches)
+        sys.exit(1 if mismatches else 0)
+
+    names = [name for name, values in args.sweep]
+    for values in itertools.product(*[values for name, values in args.sweep]):
+        params = dict(zip(names, values))
+        start = time.perf_counter()
+        bs = run(args.matches, POLICIES[args.policy1], POLICIES[args.policy2],
+                 args.max_ticks, args.seed, **params)
+        result = dict(params=dict(bs.params), seconds=time.perf_counter() - start, **report(bs))
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print('%-40s p1 %5.1f%%  p2 %5.1f%%  draw %5.1f%%  length %7s  (%.2fs)' % (
+                ' '.join('%s=%d' % item for item in params.items()) or 'defaults',
+                100*result['p1_win_rate'], 100*result['p2_win_rate'], 100*result['draw_rate'],
+                '%.0f' % result['mean_length'] if result['mean_length'] else '-', result['seconds']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+''' Benchmarks for startup, game logic, rendering and projectile stress, results go to JSON
+
+Everything runs on the SDL dummy video and audio drivers, so no window or sound
+card is needed. Example:
+
+    python bench.py --output new.json --compare old.json
+'''
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+import pygame
+
+import engine
+import replay
+from assets import Assets
+from display import Viewport
+from render import Renderer, circle
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GAME = os.path.join(HERE, 'Jumping Game.py')
+
+#Runs the real game script in a child process, exiting on the first menu frame
+STARTUP_DRIVER = r'''
+import os, runpy, sys
+import pygame
+def update(*args):
+    os._exit(0)
+pygame.display.update = pygame.display.flip = update
+sys.argv = [sys.argv[1]]
+runpy.run_path(sys.argv[0], run_name='__main__')
+'''
+
+#Replays a recording through the real game script unthrottled, timing redrawgame()
+FRAME_DRIVER = r'''
+import json, runpy, sys, time
+import pygame
+import engine
+class Clock:
+    def tick(self, *args):
+        return 0
+pygame.time.Clock = Clock
+step, update = engine.step, pygame.display.update
+marks, times = [0.0], []
+def timedStep(*args):
+    step(*args)
+    marks[0] = time.perf_counter()
+def timedUpdate(*args):
+    update(*args)
+    times.append(time.perf_counter() - marks[0])
+engine.step = timedStep
+pygame.display.update = timedUpdate
+sys.argv = [sys.argv[1], '--lockstep', '--replay', sys.argv[2]]
+runpy.run_path(sys.argv[0], run_name='__main__')
+print(json.dumps(times[1:]))
+'''
+
+def summary(samples, scale=1000.0):
+    ''' Milliseconds by default, samples are seconds '''
+    samples = sorted(samples)
+    def percentile(p):
+        return samples[min(len(samples) - 1, int(p/100.0*len(samples)))] * scale
+    return {'mean': statistics.fmean(samples)*scale, 'p50': percentile(50),
+            'p95': percentile(95), 'p99': percentile(99), 'n': len(samples)}
+
+def scriptedRecording(path, ticks, seed):
+    ''' Random but repeatable inputs, resets left out so matches play to the end '''
+    rng = random.Random(seed)
+    recorder = replay.Recorder(path, ('Bench 1', 'Bench 2'))
+    for _ in range(ticks):
+        recorder.record((rng.getrandbits(9), rng.getrandbits(9)))
+    recorder.close()
+
+def benchStartup(runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', STARTUP_DRIVER, GAME], cwd=HERE, check=True)
+        times.append(time.perf_counter() - start)
+    return summary(times)
+
+def benchTicks(recording):
+    ''' Game logic throughput, repeated until at least a second has been measured '''
+    ticks = 0
+    start = time.perf_counter()
+    while True:
+        replay.simulate(recording)
+        ticks += len(recording)
+        elapsed = time.perf_counter() - start
+        if elapsed > 1.0:
+            return {'ticks_per_second': ticks/elapsed, 'ticks': ticks}
+
+def benchFrames(path):
+    output = subprocess.run([sys.executable, '-c', FRAME_DRIVER, GAME, path], cwd=HERE,
+                            check=True, capture_output=True, text=True).stdout
+    return summary(json.loads(output.splitlines()[-1]))
+
+def benchProjectileStress(count, ticks):
+    ''' engine.step() with the pool topped up to count live projectiles every tick '''
+    rng = random.Random(count)
+    state = engine.GameState()
+    state.p2.health = 10**9#Nobody dies mid benchmark
+    pool = state.bullets
+    times = []
+    for _ in range(ticks):
+        while len(pool) < count:
+            pool.spawn(rng.randrange(1, engine.ARENA_WIDTH), rng.randrange(engine.ARENA_HEIGHT),
+                       6, (0,0,0), rng.choice((-1, 1)))
+        start = time.perf_counter()
+        engine.step(state, (rng.getrandbits(6), rng.getrandbits(6)))
+        times.append(time.perf_counter() - start)
+    return summary(times)
+
+def benchRenderStress(count, frames):
+    ''' Dirty rectangle repaint of count moving projectiles over the real background '''
+    pygame.display.init()
+    screen = pygame.display.set_mode((engine.ARENA_WIDTH, engine.ARENA_HEIGHT))
+    view = Viewport(screen)
+    renderer = Renderer(view, Assets().image('bg.jpg'))
+    rng = random.Random(count)
+    bullets = [[rng.randrange(engine.ARENA_WIDTH), rng.randrange(engine.ARENA_HEIGHT),
+                rng.choice((-10, 10))] for _ in range(count)]
+    times = []
+    for _ in range(frames):
+        for bullet in bullets:
+            bullet[0] = (bullet[0] + bullet[2]) % engine.ARENA_WIDTH
+        start = time.perf_counter()
+        renderer.present([circle(view, i, x, y, 6, (0,0,0)) for i, (x, y, vel) in enumerate(bullets)])
+        times.append(time.perf_counter() - start)
+    pygame.display.quit()
+    return summary(times)
+
+def compare(results, baseline, tolerance):
+    ''' Returns the metrics that got worse than baseline by more than tolerance '''
+    regressions = []
+    for name, metrics in results['benchmarks'].items():
+        old = baseline.get('benchmarks', {}).get(name)
+        if not old:
+            continue
+        for key, value in metrics.items():
+            if key == 'n' or key == 'ticks' or key not in old or not old[key]:
+                continue
+            higherIsBetter = key.endswith('per_second')
+            change = (old[key] - value)/old[key] if higherIsBetter else (value - old[key])/old[key]
+            if change > tolerance:
+                regressions.append('%s.%s: %.4g -> %.4g (%+.0f%%)' % (name, key, old[key], value, change*100))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Jumping Game benchmarks')
+    parser.add_argument('--output', metavar='FILE', help='write results as JSON to FILE')
+    parser.add_argument('--compare', metavar='FILE', help='fail when results regress against FILE')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed regression, default 0.10')
+    parser.add_argument('--recording', metavar='FILE', help='match recording to use instead of scripted inputs')
+    parser.add_argument('--ticks', type=int, default=3000, help='length of the scripted match')
+    parser.add_argument('--startup-runs', type=int, default=5)
+    parser.add_argument('--projectiles', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    os.chdir(HERE)#Assets are found relative to the working directory
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.recording
+        if not path:
+            path = os.path.join(tmp, 'scripted.jgr')
+            scriptedRecording(path, args.ticks, args.seed)
+        recording = replay.load(path)
+
+        benchmarks = {}
+        benchmarks['startup'] = benchStartup(args.startup_runs)
+        benchmarks['ticks'] = benchTicks(recording)
+        benchmarks['redrawgame'] = benchFrames(path)
+        benchmarks['projectile_stress_step'] = benchProjectileStress(args.projectiles, 500)
+        benchmarks['projectile_stress_render'] = benchRenderStress(args.projectiles, 200)
+
+    results = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'python': platform.python_version(), 'pygame': pygame.version.ver,
+               'machine': platform.machine(), 'recording': args.recording or 'scripted',
+               'benchmarks': benchmarks}
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print('REGRESSION', line, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
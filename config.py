@@ -0,0 +1,135 @@
+''' Characters, their animations and keys, the arena and the controls screen, from Text files/game.json
+
+The JSON is checked once and the result kept in __pycache__ next to it as a
+marshal file, stamped with the source's mtime, size and sha1. A launch with an
+unchanged file reads that back instead of parsing and checking again, a file
+with a new mtime but the same contents (a fresh PyInstaller unpack) costs a
+hash. Has no pygame dependency, the engine and runner load it too.
+'''
+import hashlib
+import json
+import marshal
+import os
+import sys
+
+GAME = 'game.json'
+FORMAT = 2#Bump when the checked form changes, older caches are then ignored
+ACTIONS = ('LEFT', 'RIGHT', 'UP', 'DOWN', 'FLY', 'LAND', 'ATTACK', 'HACK', 'UNHACK', 'RESET')
+
+#Expected shape, a type, [type] for a list of them, {str: type} for a mapping
+ARENA = {'width': int, 'height': int, 'floorRight': int, 'background': str}
+CHARACTER = {'name': str, 'folder': str, 'portrait': str, 'start': [int], 'size': [int], 'facingLeft': bool,
+             'speed': int, 'health': int, 'damage': int, 'fist': bool, 'cheats': bool,
+             'shootCooldown': int, 'punchTicks': int,
+             'walkLeft': [str], 'walkRight': [str], 'punchLeft': [str], 'punchRight': [str],
+             'jumpLeft': [str], 'jumpRight': [str], 'flyLeft': [str], 'flyRight': [str], 'standFrame': int,
+             'hud': [int], 'healthBar': [int], 'keys': {str: str}}
+SCHEMA = {'arena': ARENA, 'characters': [CHARACTER], 'controls': [[str]]}
+
+loaded = {}#Path -> checked data, this process
+
+def dataPath(name):
+    ''' Like assets.resourcePath() for Text files, without importing pygame
+
+    Found next to this module rather than in the working directory, so tools run from elsewhere load it too.
+    '''
+    here = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Text files')
+    return os.path.join(getattr(sys, '_MEIPASS', here), name)
+
+def cachePath(path):
+    directory, name = os.path.split(path)
+    return os.path.join(directory, '__pycache__', name + '.cache')
+
+def check(value, schema, where):
+    ''' Raises ValueError naming the first part of value that doesn't fit schema '''
+    if isinstance(schema, dict) and list(schema) == [str]:
+        if not isinstance(value, dict):
+            raise ValueError('%s must be an object' % where)
+        for key, item in value.items():
+            check(item, schema[str], '%s.%s' % (where, key))
+    elif isinstance(schema, dict):
+        if not isinstance(value, dict):
+            raise ValueError('%s must be an object' % where)
+        for key, item in schema.items():
+            if key not in value:
+                raise ValueError('%s is missing %s' % (where, key))
+            check(value[key], item, '%s.%s' % (where, key))
+        for key in value:
+            if key not in schema:
+                raise ValueError('%s.%s is not a known setting' % (where, key))
+    elif isinstance(schema, list):
+        if not isinstance(value, list):
+            raise ValueError('%s must be a list' % where)
+        for i, item in enumerate(value):
+            check(item, schema[0], '%s[%d]' % (where, i))
+    elif type(value) is not schema:#Exact, so true isn't taken for 1
+        raise ValueError('%s must be %s' % (where, {int: 'a whole number', bool: 'true or false',
+                                                     str: 'a string'}[schema]))
+
+def validate(data):
+    ''' The parsed game.json if it is usable, else ValueError '''
+    check(data, SCHEMA, GAME)
+    if len(data['characters']) != 2:
+        raise ValueError('%s.characters must hold two characters, the menu and HUD are for two players' % GAME)
+    for i, character in enumerate(data['characters']):
+        where = '%s.characters[%d]' % (GAME, i)
+        for name, length in (('start', 2), ('size', 2), ('hud', 2), ('healthBar', 3)):
+            if len(character[name]) != length:
+                raise ValueError('%s.%s must hold %d numbers' % (where, name, length))
+        for name in ('speed', 'health', 'shootCooldown', 'punchTicks'):
+            if character[name] <= 0:
+                raise ValueError('%s.%s must be above 0' % (where, name))
+        if not character['walkLeft'] or len(character['walkLeft']) != len(character['walkRight']):
+            raise ValueError('%s walkLeft and walkRight must be the same, non zero length' % where)
+        for name in ('jump', 'fly'):#Optional, the standing frame is shown without them
+            if len(character[name + 'Left']) != len(character[name + 'Right']):
+                raise ValueError('%s %sLeft and %sRight must be the same length' % (where, name, name))
+        if not 0 <= character['standFrame'] < len(character['walkLeft']):
+            raise ValueError('%s.standFrame is not one of the walk frames' % where)
+        if character['fist'] and min(len(character['punchLeft']), len(character['punchRight'])) < (character['punchTicks'] + 3)//4:
+            raise ValueError('%s needs a punch frame for every 4 punchTicks' % where)
+        for key, action in character['keys'].items():
+            if action not in ACTIONS:
+                raise ValueError('%s.keys.%s must be one of %s' % (where, key, ', '.join(ACTIONS)))
+    return data
+
+def readCache(path):
+    try:
+        with open(path, 'rb') as f:
+            cached = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cached, tuple) or len(cached) != 5 or cached[0] != FORMAT:
+        return None
+    return cached
+
+def writeCache(path, cached):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            marshal.dump(cached, f)
+        os.replace(path + '.tmp', path)
+    except OSError:#Read only install, the next launch just checks the file again
+        pass
+
+def load(name=GAME):
+    ''' The checked contents of a data file, compiled on first use '''
+    path = dataPath(name)
+    if path in loaded:
+        return loaded[path]
+    stat = os.stat(path)
+    cache = cachePath(path)
+    cached = readCache(cache)
+    if cached and cached[1:3] == (stat.st_mtime_ns, stat.st_size):
+        data = cached[4]
+    else:
+        with open(path, 'rb') as f:
+            source = f.read()
+        digest = hashlib.sha1(source).digest()
+        if cached and cached[3] == digest:
+            data = cached[4]
+        else:
+            data = validate(json.loads(source.decode('utf-8')))
+        writeCache(cache, (FORMAT, stat.st_mtime_ns, stat.st_size, digest, data))
+    loaded[path] = data
+    return data
@@ -0,0 +1,169 @@
+''' The game always draws in its logical 850x480 space, a Viewport maps that onto the real window
+
+At the logical size the window is drawn on directly and nothing is scaled.
+Otherwise images are scaled once per window size and cached, by plain pixel
+repetition when the scale is a whole number and smoothly when it isn't, so
+a frame costs the same blits at 4K as at 850x480.
+'''
+import math
+from collections import OrderedDict
+
+import pygame
+
+LOGICAL_SIZE = (850, 480)
+
+class Viewport:
+    ''' Letterboxed mapping from logical coordinates onto window, with the drawing calls the renderer needs '''
+    def __init__(self, window, size=LOGICAL_SIZE, integer=False, maxsize=512):
+        self.window = window
+        self.size = size
+        self.integer = integer#Only whole number scales, with wider borders
+        self.maxsize = maxsize
+        self.images = OrderedDict()#id(surface) -> (surface, scaled), least recently used first
+        self.resize()
+
+    def resize(self):
+        ''' Recomputes the scale for the window's current size, dropping every scaled image '''
+        width, height = self.window.get_size()
+        scale = min(width / self.size[0], height / self.size[1])
+        if self.integer and scale >= 1:
+            scale = math.floor(scale)
+        if abs(scale - round(scale)) < 1e-6:
+            scale = round(scale)
+        self.scale = scale
+        self.smooth = scale != int(scale)
+        self.offset = ((width - round(self.size[0]*scale)) // 2, (height - round(self.size[1]*scale)) // 2)
+        self.unscaled = scale == 1 and self.offset == (0, 0)#Logical and window pixels are the same
+        self.area = self.toWindow(self.get_rect())
+        self.images.clear()
+
+    def get_rect(self):
+        return pygame.Rect((0, 0), self.size)
+
+    def toWindow(self, rect):
+        ''' Window pixels covering a logical rect '''
+        if self.scale == 1:
+            return pygame.Rect(rect).move(self.offset)
+        x, y, w, h = pygame.Rect(rect)#Truncated like every other rect pygame is given
+        scale = self.scale
+        left, top = math.floor(x*scale), math.floor(y*scale)
+        right, bottom = math.ceil((x + w)*scale), math.ceil((y + h)*scale)
+        return pygame.Rect(left + self.offset[0], top + self.offset[1], right - left, bottom - top)
+
+    def toLogical(self, position):
+        x, y = position
+        return (int((x - self.offset[0]) // self.scale), int((y - self.offset[1]) // self.scale))
+
+    def point(self, position):
+        if self.unscaled:
+            return position
+        x, y = int(position[0]), int(position[1])#Same rounding as a blit at the logical size
+        return (math.floor(x*self.scale) + self.offset[0], math.floor(y*self.scale) + self.offset[1])
+
+    def image(self, surface):
+        ''' surface at the window scale, made on first use and cached '''
+        if self.scale == 1:
+            return surface
+        key = id(surface)
+        entry = self.images.get(key)
+        if entry is not None and entry[0] is surface:
+            self.images.move_to_end(key)
+            return entry[1]
+        w, h = surface.get_size()
+        size = (max(1, round(w*self.scale)), max(1, round(h*self.scale)))
+        if self.smooth and surface.get_bitsize() >= 24:
+            scaled = pygame.transform.smoothscale(surface, size)
+        else:
+            scaled = pygame.transform.scale(surface, size)
+        self.images[key] = (surface, scaled)#Holding surface keeps its id from being reused
+        if len(self.images) > self.maxsize:
+            self.images.popitem(last=False)
+        return scaled
+
+    def prescale(self, surfaces):
+        ''' Scales surfaces up front so the first frames don't stall on it '''
+        for surface in surfaces:
+            self.image(surface)
+
+    def blit(self, surface, position):
+        return self.window.blit(self.image(surface), self.point(position))
+
+    def blits(self, sprites):
+        ''' Draws (surface, position) pairs in one call '''
+        if self.unscaled:
+            self.window.blits(sprites, False)
+        else:
+            self.window.blits([(self.image(surface), self.point(position)) for surface, position in sprites], False)
+
+    def restore(self, bg, area):
+        ''' Repaints a logical area from the background '''
+        target = self.toWindow(area)
+        self.window.blit(self.image(bg), target, target.move(-self.offset[0], -self.offset[1]))
+
+    def fill(self, colour, rect):
+        rect = pygame.Rect(rect)
+        if rect.w > 0 and rect.h > 0:
+            self.window.fill(colour, self.toWindow(rect))
+
+    def circle(self, colour, center, radius, width=0):
+        scale = self.scale
+        pygame.draw.circle(self.window, colour, self.point(center), max(1, round(radius*scale)),
+                           width and max(1, round(width*scale)))
+
+    def set_clip(self, rect):
+        self.window.set_clip(self.toWindow(rect) if rect else None)
+
+    def clear(self):
+        ''' Blacks out the borders around the game '''
+        if self.area != self.window.get_rect():
+            self.window.fill((0, 0, 0))
+
+    def update(self, rects):
+        ''' Uploads the logical rects to the window '''
+        if self.unscaled:
+            pygame.display.update(rects)
+        else:
+            pygame.display.update([self.toWindow(rect) for rect in rects])
+
+    def present(self, surface):
+        ''' Shows a whole logical frame drawn onto surface, for screens that don't use the renderer '''
+        if surface is not self.window:
+            self.clear()
+            target = self.window.subsurface(self.area)
+            if self.smooth:
+                pygame.transform.smoothscale(surface, self.area.size, target)
+            else:
+                pygame.transform.scale(surface, self.area.size, target)
+        pygame.display.update()
+
+viewport = None#Set by setMode()
+
+def setMode(windowSize=None, fullscreen=False, integer=False):
+    ''' Opens the window and returns the logical surface to draw on, the window itself when unscaled '''
+    global viewport
+    if fullscreen:
+        window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    else:
+        window = pygame.display.set_mode(windowSize or LOGICAL_SIZE)
+    viewport = Viewport(window, integer=integer)
+    if window.get_size() == LOGICAL_SIZE:
+        return window
+    return pygame.Surface(LOGICAL_SIZE).convert()
+
+def present(surface):
+    ''' Shows a finished logical frame, see Viewport.present() '''
+    if viewport:
+        viewport.present(surface)
+    else:
+        pygame.display.update()
+
+def mousePos():
+    ''' Mouse position in logical coordinates '''
+    position = pygame.mouse.get_pos()
+    return viewport.toLogical(position) if viewport else position
+
+def logicalEvent(event):
+    ''' event with any window position translated into logical coordinates '''
+    if viewport is None or viewport.unscaled or not hasattr(event, 'pos'):
+        return event
+    return pygame.event.Event(event.type, dict(event.dict, pos=viewport.toLogical(event.pos)))
@@ -0,0 +1,264 @@
+''' Headless game logic for Jumping Game, has no pygame dependency '''
+import struct
+from operator import attrgetter
+
+import config
+from projectiles import ProjectilePool
+
+#Input bits, one mask per player per tick
+LEFT = 1
+RIGHT = 2
+UP = 4
+DOWN = 8
+FLY = 16
+LAND = 32
+ATTACK = 64#Shoot for player 1, punch for player 2
+HACK = 128
+UNHACK = 256
+RESET = 512
+
+TICK_RATE = 27#Ticks per second, every speed and counter below is per tick
+GAME = config.load()#The roster and arena, see Text files/game.json
+ARENA_WIDTH = GAME['arena']['width']
+ARENA_HEIGHT = GAME['arena']['height']
+FLOOR_RIGHT = GAME['arena']['floorRight']#Right hand wall the players walk up to
+WALK_TICKS = 3#Ticks each walk frame is shown for
+PUNCH_TICKS = 4#Ticks each punch frame is shown for
+
+class Player:
+    ''' One fighter, the same walk, jump and fly rules drive every player
+
+    fist players punch with ATTACK, the others shoot, and only cheats players
+    listen to HACK and UNHACK. walkFrames is the length of the walk cycle and
+    punchTicks how long a punch lasts.
+    '''
+    __slots__ = ('x', 'y', 'width', 'height', 'speed', 'health', 'damage', 'baseSpeed', 'baseDamage',
+                 'jumpcount', 'walkcount', 'walkFrames', 'punchcount', 'punchTicks', 'shootLoop',
+                 'shootCooldown', 'shots', 'isJump', 'isFly', 'left', 'right', 'facingLeft', 'punch', 'alive',
+                 'fist', 'cheats')
+
+    def __init__(self, x=0, y=400, speed=5, health=10, damage=1, facingLeft=False, walkFrames=9,
+                 fist=False, cheats=False, width=40, height=60, shootCooldown=7, punchTicks=12):
+        self.x, self.y = x, y#Coordinates
+        self.width, self.height = width, height
+        self.speed = self.baseSpeed = speed
+        self.health = health
+        self.damage = self.baseDamage = damage
+        self.jumpcount = 10#JUMP variables
+        self.isJump = False
+        self.isFly = False#FLY variables
+        self.left = self.right = False
+        self.facingLeft = facingLeft
+        #Animation counters, animation.py turns them into the frame to draw
+        self.walkcount = self.punchcount = 0
+        self.walkFrames = walkFrames
+        self.punchTicks = punchTicks
+        self.punch = False
+        self.shootLoop = 0
+        self.shootCooldown = shootCooldown#Ticks before the player can shoot again
+        self.shots = 0#Bullets fired
+        self.alive = True
+        self.fist = fist
+        self.cheats = cheats
+
+def character(c):
+    ''' A Player from one of game.json's characters '''
+    return Player(c['start'][0], c['start'][1], speed=c['speed'], health=c['health'], damage=c['damage'],
+                  facingLeft=c['facingLeft'], walkFrames=len(c['walkLeft']), fist=c['fist'], cheats=c['cheats'],
+                  width=c['size'][0], height=c['size'][1], shootCooldown=c['shootCooldown'],
+                  punchTicks=c['punchTicks'])
+
+class GameState:
+    ''' Everything that changes during a match, one instance per match
+
+    characters defaults to game.json's roster.
+    '''
+    def __init__(self, characters=None):
+        self.players = [character(c) for c in characters or GAME['characters']]
+        self.p1, self.p2 = self.players[0], self.players[1]#Shortcuts, rosters may hold more than two
+        self.bullets = ProjectilePool()
+        self.ticks = 0
+        self.arrange()
+        self.start = self.snapshot()
+
+    def arrange(self):
+        ''' Works out who can hit whom, call after changing players or their weapons '''
+        players = self.players
+        self.rivals = [(number, p, [o for o in players if o is not p]) for number, p in enumerate(players, 1)]
+        shooters = {number for number, p in enumerate(players, 1) if not p.fist}
+        #Only players somebody else can shoot are worth testing against bullets
+        self.targets = [(number, p) for number, p in enumerate(players, 1) if shooters - {number}]
+
+    def reset(self):
+        ''' Back to the opening position, only the tick count carries on '''
+        ticks = self.ticks
+        self.restore(self.start)
+        self.ticks = ticks
+
+    def snapshot(self):
+        ''' The whole state as a few hundred bytes, see restore() '''
+        data = [SNAPSHOT.pack(SNAPSHOT_VERSION, self.ticks, len(self.players), self.bullets.capacity)]
+        for player in self.players:
+            data.append(PLAYER.pack(*getInts(player), *getBools(player)))
+        data.append(self.bullets.snapshot())
+        return b''.join(data)
+
+    def restore(self, data):
+        ''' Puts this state back to a snapshot(), in place '''
+        version, self.ticks, count, capacity = SNAPSHOT.unpack_from(data)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError('not a version %d Jumping Game snapshot' % SNAPSHOT_VERSION)
+        while len(self.players) < count:
+            self.players.append(Player())
+        del self.players[count:]
+        self.p1, self.p2 = self.players[0], self.players[1]
+        offset = SNAPSHOT.size
+        for player in self.players:
+            for name, value in zip(PLAYER_FIELDS, PLAYER.unpack_from(data, offset)):
+                setattr(player, name, value)
+            offset += PLAYER.size
+        self.bullets.restore(data[offset:], capacity)
+        self.arrange()
+
+    def winner(self):
+        ''' Returns the number of the last player standing, otherwise None '''
+        alive = [number for number, player in enumerate(self.players, 1) if player.alive]
+        return alive[0] if len(alive) == 1 else None
+
+def statTarget(s, name):
+    ''' (player, attribute) behind a stat name like speed2, no number means player 1 '''
+    if name[-1].isdigit():
+        return s.players[int(name[-1]) - 1], name[:-1]
+    return s.p1, name
+
+#Snapshot layout, little endian: the header struct, one PLAYER per player then the projectiles' RECORDs
+INT_FIELDS = ('x', 'y', 'width', 'height', 'speed', 'health', 'damage', 'baseSpeed', 'baseDamage', 'jumpcount',
+              'walkcount', 'walkFrames', 'punchcount', 'punchTicks', 'shootLoop', 'shootCooldown', 'shots')
+BOOL_FIELDS = ('isJump', 'isFly', 'left', 'right', 'facingLeft', 'punch', 'alive', 'fist', 'cheats')
+PLAYER_FIELDS = INT_FIELDS + BOOL_FIELDS
+SNAPSHOT_VERSION = 4
+SNAPSHOT = struct.Struct('<BiBH')#Version, ticks, players, projectile capacity
+PLAYER = struct.Struct('<%di%d?' % (len(INT_FIELDS), len(BOOL_FIELDS)))
+getInts = attrgetter(*INT_FIELDS)
+getBools = attrgetter(*BOOL_FIELDS)
+
+def jump(jumpcount, y):
+    ''' One tick of the jump arc, returns the new (jumpcount, y, isJump) '''
+    if jumpcount >= -10:
+        negative = -1 if jumpcount < 0 else 1
+        return jumpcount - 1, y - ((jumpcount**2)//3)*negative, True
+    return 10, y, False
+
+def walk(p, keys, others):
+    ''' The punch, walk and hack controls, nobody walks through a player unless one of them is jumping '''
+    if p.fist and keys & ATTACK:#Punching player
+        p.punch = True
+        for o in others:
+            if p.x-p.width < o.x < p.x+p.width and not(o.isJump) and p.y <= o.y <= p.y+p.height:
+                o.isJump = True
+                o.health -= p.damage
+    elif keys & LEFT and p.x > p.speed and all(not(o.x < p.x < o.x+o.width) or p.isJump or o.isJump for o in others):#Walking left
+        p.x -= p.speed
+        p.left = True
+        p.right = False
+    elif keys & RIGHT and p.x < FLOOR_RIGHT-p.width-p.speed and all(not(o.x-o.width < p.x < o.x) or p.isJump or o.isJump for o in others):#Walking Right
+        p.x += p.speed
+        p.left = False
+        p.right = True
+    elif p.cheats and keys & HACK:
+        p.speed += 1
+        p.damage += 1
+    elif p.cheats and keys & UNHACK:
+        p.speed = p.baseSpeed
+        p.damage = p.baseDamage
+    else:#Standing Idle
+        p.left = False
+        p.right = False
+        p.walkcount = 0
+
+def move(p, keys):
+    ''' The fly and jump controls '''
+    if not p.isFly:#Enable FLYING
+        if keys & FLY:
+            p.isFly = True
+    else:#Main Flying Loop
+        if keys & UP and p.y > 0:
+            p.y -= p.speed
+        elif keys & DOWN and p.y < ARENA_HEIGHT-p.height-p.speed:
+            p.y += p.speed
+        elif keys & LAND:#Disabling FLYING
+            p.isFly = False
+    if not p.isJump:#Enable JUMP
+        if keys & UP:
+            p.isJump = True
+    else:#Main Jump loop
+        p.jumpcount, p.y, p.isJump = jump(p.jumpcount, p.y)
+
+def animate(p):
+    ''' Advances the sprite counters and which way p faces '''
+    if p.walkcount+1 > WALK_TICKS*p.walkFrames:
+        p.walkcount = 0
+    if p.punchcount+1 > p.punchTicks:
+        p.punchcount = 0
+        p.punch = False
+
+    if p.punch:
+        p.punchcount += 1
+    elif p.left:
+        p.walkcount += 1
+        p.facingLeft = True
+    elif p.right:
+        p.walkcount += 1
+        p.facingLeft = False
+
+def step(s, inputs, profiler=None):
+    ''' Advances the match by one tick, inputs holds one bit mask per player
+
+    An optional profiler.FrameProfiler gets the time split into physics and collisions.
+    '''
+    players = s.players
+
+    for p in players:
+        if p.health <= 0:
+            p.alive = False
+            p.x, p.y = 0, 0
+            break#One death a tick, player 1 first
+    for p in players:
+        if p.shootLoop > 0:
+            p.shootLoop += 1
+        if p.shootLoop > p.shootCooldown:
+            p.shootLoop = 0
+    if profiler: profiler.mark('physics')
+
+    bullets = s.bullets
+    if len(bullets):
+        hits = bullets.hits({number: (p.x, p.y, p.width, p.height) for number, p in s.targets})
+        for slot, target in hits:
+            p = players[target-1]
+            p.health -= players[bullets.owner[slot]-1].damage
+            if p.health < 0: p.health = 0
+            p.isJump = True
+        bullets.release([slot for slot, target in hits])
+        bullets.cull(ARENA_WIDTH)
+        bullets.advance()
+    if profiler: profiler.mark('collisions')
+
+    pressed = 0
+    for (number, p, others), keys in zip(s.rivals, inputs):
+        if not p.fist and keys & ATTACK and p.shootLoop == 0:
+            if len(bullets) < 2:
+                bullets.spawn(p.x + p.width//2, p.y + p.height//2, 6, (0,0,0), -1 if p.facingLeft else 1, number)
+                p.shots += 1
+            p.shootLoop = 1
+        walk(p, keys, others)
+        pressed |= keys
+
+    if pressed & RESET:
+        s.reset()
+
+    for p, keys in zip(players, inputs):
+        move(p, keys)
+        if p.alive:
+            animate(p)
+    s.ticks += 1
+    if profiler: profiler.mark('physics')
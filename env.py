@@ -0,0 +1,137 @@
+''' Gym style training environments around the engine rules, no window needed
+
+Actions are the engine's input bit masks, one per player per step, so a
+bot presses exactly the keys a human would (K_q shoots, K_p punches). The
+observation is either a compact float32 state vector or a downscaled RGB
+frame, an (width, height, 3) view from pygame.surfarray.pixels3d() into
+the env's own surface. That view is not a copy, the next step overwrites it.
+'''
+import os
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+import numpy as np
+import pygame
+
+import engine
+from engine import LEFT, RIGHT, UP, DOWN, FLY, LAND, ATTACK, HACK, UNHACK
+
+#Keys each player is allowed to press, RESET is left to reset()
+PLAYER1_ACTIONS = LEFT | RIGHT | UP | DOWN | FLY | LAND | ATTACK
+PLAYER2_ACTIONS = PLAYER1_ACTIONS | HACK | UNHACK
+
+MAX_BULLETS = 2
+STATE_SIZE = 16 + 3*MAX_BULLETS
+WIN_REWARD = 10.0
+MAX_HEALTH = [float(c['health']) for c in engine.GAME['characters']]#Starting health of each player
+
+def observeState(s, out):
+    ''' Fills out, a float32 array of STATE_SIZE, with s scaled to roughly 0..1 '''
+    w, h = float(engine.ARENA_WIDTH), float(engine.ARENA_HEIGHT)
+    p1, p2 = s.p1, s.p2
+    out[:16] = (p1.x/w, p1.y/h, p2.x/w, p2.y/h, p1.health/MAX_HEALTH[0], p2.health/MAX_HEALTH[1],
+                p1.isJump, p2.isJump, p1.isFly, p2.isFly, p1.jumpcount/10.0, p2.jumpcount/10.0,
+                p1.facingLeft, p2.facingLeft, p1.shootLoop/float(p1.shootCooldown), p2.punch)
+    out[16:] = 0.0
+    for i, (slot, x, y, radius, colour) in enumerate(s.bullets.rows()[:MAX_BULLETS]):
+        out[16 + 3*i:19 + 3*i] = (x/w, y/h, s.bullets.vel[slot]/10.0)
+    return out
+
+class FrameRenderer:
+    ''' Flat coloured boxes and dots of a match, scaled down into a reused surface, small if given '''
+    def __init__(self, size=(85, 48), small=None):
+        self.full = pygame.Surface((engine.ARENA_WIDTH, engine.ARENA_HEIGHT))
+        self.small = small or pygame.Surface(size)
+        self.size = size
+        self.pixels = pygame.surfarray.pixels3d(self.small)#Locks small for as long as we live
+
+    def draw(self, s):
+        full = self.full
+        full.fill((0, 0, 0))
+        for p, colour in zip(s.players, ((0, 128, 255), (255, 64, 0))):
+            if p.alive:
+                full.fill(colour, (p.x, p.y, p.width, p.height))
+        for slot, x, y, radius, colour in s.bullets.rows():
+            pygame.draw.circle(full, (255, 255, 255), (x, y), radius)
+        pygame.transform.scale(full, self.size, self.small)
+        return self.pixels
+
+class MatchEnv:
+    ''' One two player match, step() takes a (player1, player2) pair of key masks
+
+    Rewards are a pair too, damage dealt minus damage taken plus WIN_REWARD
+    to the winner, so each side can be trained from the same transitions.
+    out is where observations are written, a float32 array of STATE_SIZE or
+    a frameSize surface, by default the env makes its own.
+    '''
+    def __init__(self, observation='state', frameSize=(85, 48), maxTicks=engine.TICK_RATE*120, out=None):
+        if observation not in ('state', 'pixels'):
+            raise ValueError("observation must be 'state' or 'pixels'")
+        self.observation = observation
+        self.maxTicks = maxTicks
+        self.frames = FrameRenderer(frameSize, out) if observation == 'pixels' else None
+        self.vector = out if observation == 'state' and out is not None else np.zeros(STATE_SIZE, np.float32)
+        self.state = None
+
+    def observe(self):
+        if self.frames:
+            return self.frames.draw(self.state)
+        return observeState(self.state, self.vector)
+
+    def reset(self):
+        self.state = engine.GameState()
+        return self.observe()
+
+    def step(self, actions):
+        ''' Returns (observation, (reward1, reward2), done, info) '''
+        p1, p2 = self.state.p1, self.state.p2
+        health1, health2 = p1.health, p2.health
+        engine.step(self.state, (int(actions[0]) & PLAYER1_ACTIONS, int(actions[1]) & PLAYER2_ACTIONS))
+        lost1, lost2 = health1 - p1.health, health2 - p2.health
+        #engine.step() only notices a death at the start of the next tick, same order here
+        winner = 2 if p1.health <= 0 else 1 if p2.health <= 0 else None
+        reward1, reward2 = float(lost2 - lost1), float(lost1 - lost2)
+        if winner == 1:
+            reward1, reward2 = reward1 + WIN_REWARD, reward2 - WIN_REWARD
+        elif winner == 2:
+            reward1, reward2 = reward1 - WIN_REWARD, reward2 + WIN_REWARD
+        done = winner is not None or self.state.ticks >= self.maxTicks
+        return self.observe(), (reward1, reward2), done, {'winner': winner, 'ticks': self.state.ticks}
+
+class VectorEnv:
+    ''' n MatchEnvs stepped together, finished matches restart automatically
+
+    Observations come back stacked in one array, (n, STATE_SIZE) or
+    (n, width, height, 3), that every env writes into directly: its row of
+    the state array, or for pixels its strip of one shared surface that the
+    array is a pixels3d() view of. Actions are an (n, 2) array of key masks.
+    '''
+    def __init__(self, n, observation='state', frameSize=(85, 48), maxTicks=engine.TICK_RATE*120):
+        width, height = frameSize
+        if observation == 'pixels':
+            self.surface = pygame.Surface((n*width, height))
+            outs = [self.surface.subsurface((i*width, 0, width, height)) for i in range(n)]
+            self.observations = pygame.surfarray.pixels3d(self.surface)
+            self.observations.shape = (n, width, height, 3)#Raises rather than copy if the strips can't be a view
+        else:
+            self.observations = np.zeros((n, STATE_SIZE), np.float32)
+            outs = list(self.observations)
+        self.envs = [MatchEnv(observation, frameSize, maxTicks, out) for out in outs]
+        self.rewards = np.zeros((n, 2), np.float32)
+        self.dones = np.zeros(n, bool)
+
+    def reset(self):
+        for env in self.envs:
+            env.reset()
+        return self.observations
+
+    def step(self, actions):
+        ''' Returns (observations, rewards, dones, infos), a done row already holds the next match '''
+        infos = []
+        for i, env in enumerate(self.envs):
+            observation, self.rewards[i], self.dones[i], info = env.step(actions[i])
+            if self.dones[i]:
+                info['final_observation'] = observation.copy()
+                env.reset()
+            infos.append(info)
+        return self.observations, self.rewards, self.dones, infos
@@ -0,0 +1,42 @@
+''' Font registry and a least recently used cache of rendered text surfaces '''
+from collections import OrderedDict
+
+import pygame
+
+class TextCache:
+    ''' Rendered text surfaces keyed by (font, text, colour, antialias) '''
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = self.misses = 0
+
+    def font(self, name, size, bold=False, italic=False):
+        ''' pygame.font.SysFont enumerates the system fonts, so each font is only looked up once '''
+        key = (name, size, bold, italic)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.SysFont(name, size, bold, italic)
+        return font
+
+    def render(self, font, text, antialias, colour):
+        key = (font, text, tuple(colour), bool(antialias))
+        surfaces = self.surfaces
+        surface = surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+            surface = surfaces[key] = font.render(text, antialias, colour)
+            if len(surfaces) > self.maxsize:
+                surfaces.popitem(last=False)
+        else:
+            self.hits += 1
+            surfaces.move_to_end(key)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+#Shared by every screen
+cache = TextCache()
+font = cache.font
+render = cache.render
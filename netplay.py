@@ -0,0 +1,231 @@
+''' Two player netplay over UDP with rollback, each machine runs the whole engine
+
+Every tick a client sends its unacknowledged local input masks to the peer,
+so a lost packet is covered by the next one. The local input is simulated
+straight away against a prediction of the remote one (its last confirmed
+mask). When the real remote input turns out different, the state is rolled
+back to that tick and re-simulated, which the engine allows since it is
+deterministic for a given sequence of inputs.
+
+Packet layout, little endian: the header struct below then count uint16
+masks for ticks first, first+1, ...
+
+Loopback self test through an artificial 80 ms, 10% loss link:
+
+    python netplay.py --latency 80 --jitter 20 --loss 0.1
+'''
+import argparse
+import heapq
+import random
+import socket
+import struct
+import time
+
+import engine
+
+MAGIC = b'JGNP'
+PACKET = struct.Struct('<4sBIIB')#Magic, sending player, ticks confirmed by the sender, first tick, count
+MAX_FRAMES = 64#Inputs in one packet
+
+class UdpTransport:
+    ''' Non blocking datagram socket talking to one peer '''
+    def __init__(self, port, peer, host=''):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.peer = peer
+
+    def send(self, data):
+        try:
+            self.sock.sendto(data, self.peer)
+        except OSError:#Peer not up yet, the next packet repeats the inputs anyway
+            pass
+
+    def receive(self):
+        packets = []
+        while True:
+            try:
+                data, address = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return packets
+            except ConnectionResetError:#Windows reports an unreachable peer here
+                continue
+            packets.append(data)
+
+    def close(self):
+        self.sock.close()
+
+class LossyTransport:
+    ''' Wraps a transport, delaying outgoing packets by latency +- jitter seconds and dropping some '''
+    def __init__(self, transport, latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        self.transport = transport
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.queue = []#Heap of (due, sequence, data)
+        self.sequence = 0
+
+    def send(self, data):
+        if self.rng.random() >= self.loss:
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            heapq.heappush(self.queue, (time.perf_counter() + delay, self.sequence, data))
+            self.sequence += 1
+        self.pump()
+
+    def pump(self):
+        now = time.perf_counter()
+        while self.queue and self.queue[0][0] <= now:
+            self.transport.send(heapq.heappop(self.queue)[2])
+
+    def receive(self):
+        self.pump()
+        return self.transport.receive()
+
+    def close(self):
+        self.transport.close()
+
+class RollbackSession:
+    ''' One side of a networked match, player is the local player (1 or 2)
+
+    Call advance() once per logic tick with the local input mask. The match
+    is never more than maxRollback ticks ahead of the last confirmed remote
+    input, when it would be advance() waits for the peer and returns False.
+    '''
+    def __init__(self, player, transport, state=None, maxRollback=8):
+        self.player = player
+        self.transport = transport
+        self.state = state or engine.GameState()
+        self.maxRollback = maxRollback
+        self.tick = 0#Next tick to simulate
+        self.local = {}#Tick -> local mask
+        self.remote = {}#Tick -> confirmed remote mask
+        self.predicted = {}#Tick -> remote mask the current state was simulated with
+        self.snapshots = {}#Tick -> state before that tick
+        self.confirmed = -1#Every remote input up to here has arrived
+        self.acked = -1#The peer has every local input up to here
+        self.pruned = 0
+        self.rollbacks = self.stalls = 0
+
+    def inputs(self, tick):
+        ''' (player 1, player 2) masks for tick, the remote one predicted if it hasn't arrived '''
+        remote = self.remote.get(tick)
+        if remote is None:
+            remote = self.remote.get(self.confirmed, 0)
+        self.predicted[tick] = remote
+        return (self.local[tick], remote) if self.player == 1 else (remote, self.local[tick])
+
+    def simulate(self, tick, profiler=None):
+        self.snapshots[tick] = self.state.snapshot()
+        engine.step(self.state, self.inputs(tick), profiler)
+
+    def send(self):
+        first = max(self.acked + 1, self.tick - MAX_FRAMES)
+        masks = [self.local[tick] for tick in range(first, self.tick)]
+        self.transport.send(PACKET.pack(MAGIC, self.player, self.confirmed + 1, first, len(masks))
+                            + struct.pack('<%dH' % len(masks), *masks))
+
+    def receive(self):
+        ''' Stores the peer's inputs, returns the earliest mispredicted tick or None '''
+        earliest = None
+        for data in self.transport.receive():
+            if len(data) < PACKET.size:
+                continue
+            magic, player, confirmed, first, count = PACKET.unpack_from(data)
+            if magic != MAGIC or player == self.player or len(data) != PACKET.size + 2*count:
+                continue
+            self.acked = max(self.acked, confirmed - 1)
+            masks = struct.unpack_from('<%dH' % count, data, PACKET.size)
+            for tick, mask in enumerate(masks, first):
+                if tick <= self.confirmed or tick in self.remote:
+                    continue
+                self.remote[tick] = mask
+                if tick < self.tick and self.predicted[tick] != mask and (earliest is None or tick < earliest):
+                    earliest = tick
+            while self.confirmed + 1 in self.remote:
+                self.confirmed += 1
+        return earliest
+
+    def rollback(self, tick):
+        self.state.restore(self.snapshots[tick])
+        for replayed in range(tick, self.tick):
+            self.simulate(replayed)
+        self.rollbacks += 1
+
+    def prune(self):
+        ''' Forgets ticks that can no longer be rolled back to or resent '''
+        floor = min(self.confirmed, self.acked + 1)
+        for tick in range(self.pruned, floor):
+            for table in (self.local, self.remote, self.predicted, self.snapshots):
+                table.pop(tick, None)
+        self.pruned = max(self.pruned, floor)
+
+    def poll(self):
+        ''' Takes in whatever the peer sent, re-simulating from the first misprediction '''
+        earliest = self.receive()
+        if earliest is not None:
+            self.rollback(earliest)
+
+    def advance(self, mask, profiler=None):
+        ''' Runs one tick with the local input mask, returns False while waiting for the peer '''
+        self.poll()
+        if self.tick - self.confirmed > self.maxRollback:
+            self.send()#Keep resending so a lost packet can't stall both sides
+            self.stalls += 1
+            return False
+        self.local[self.tick] = mask
+        self.simulate(self.tick, profiler)
+        self.tick += 1
+        self.send()
+        self.prune()
+        return True
+
+def selfTest(args):
+    ''' Plays a random match between two sessions over loopback, checking they agree '''
+    ports = (args.port, args.port + 1)
+    sessions = []
+    for player in (1, 2):
+        transport = UdpTransport(ports[player - 1], ('127.0.0.1', ports[2 - player]), '127.0.0.1')
+        transport = LossyTransport(transport, args.latency/1000.0, args.jitter/1000.0, args.loss, player)
+        sessions.append(RollbackSession(player, transport, maxRollback=args.max_rollback))
+    rng = random.Random(args.seed)
+    played = {1: [], 2: []}#Each side's own inputs in the order they were applied
+    start = time.perf_counter()
+    for frame in range(args.ticks * 20):
+        for session in sessions:
+            mask = rng.getrandbits(9)#No resets
+            if session.tick < args.ticks:
+                if session.advance(mask):
+                    played[session.player].append(mask)
+            else:#Finished, but the peer may still need our inputs
+                session.poll()
+                session.send()
+        if all(session.tick >= args.ticks and session.confirmed >= args.ticks - 1 for session in sessions):
+            break
+        time.sleep(1.0 / engine.TICK_RATE / 4)
+    else:
+        raise SystemExit('peers never caught up')
+    reference = engine.GameState()
+    for inputs in zip(played[1], played[2]):
+        engine.step(reference, inputs)
+    for session in sessions:
+        state = session.state
+        same = state.snapshot() == reference.snapshot()
+        print('player %d: %d ticks, %d rollbacks, %d stalls, %s' % (
+            session.player, state.ticks, session.rollbacks, session.stalls,
+            'matches' if same else 'DIVERGED'))
+    print('%.1f s' % (time.perf_counter() - start))
+
+def main():
+    parser = argparse.ArgumentParser(description='Rollback netplay loopback self test')
+    parser.add_argument('--ticks', type=int, default=engine.TICK_RATE*30)
+    parser.add_argument('--latency', type=float, default=60.0, help='one way delay in ms')
+    parser.add_argument('--jitter', type=float, default=15.0, help='+- ms on the delay')
+    parser.add_argument('--loss', type=float, default=0.05, help='fraction of packets dropped')
+    parser.add_argument('--max-rollback', type=int, default=8)
+    parser.add_argument('--port', type=int, default=47800)
+    parser.add_argument('--seed', type=int, default=0)
+    selfTest(parser.parse_args())
+
+if __name__ == '__main__':
+    main()
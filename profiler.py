@@ -0,0 +1,115 @@
+''' Per-frame timing of named sections with rolling histograms and an on-screen overlay '''
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+
+SECTIONS = ('input', 'ai', 'physics', 'collisions', 'render', 'display')
+
+class RollingHistogram:
+    ''' Counts of the last window samples in fixed width millisecond bins '''
+    def __init__(self, window=270, binWidth=0.05, bins=2000):
+        self.binWidth = binWidth
+        self.counts = [0] * bins
+        self.samples = deque()
+        self.window = window
+
+    def add(self, ms):
+        index = min(int(ms / self.binWidth), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.samples.append(index)
+        if len(self.samples) > self.window:
+            self.counts[self.samples.popleft()] -= 1
+
+    def percentile(self, p):
+        ''' Upper edge of the bin holding the p-th percentile, in milliseconds '''
+        if not self.samples:
+            return 0.0
+        target = p / 100.0 * len(self.samples)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return (index + 1) * self.binWidth
+        return len(self.counts) * self.binWidth
+
+class FrameProfiler:
+    ''' Lap timer, mark(section) charges the time since the previous mark to section
+
+    Call begin() at the top of every frame and end() once it's done, time
+    between marks that isn't charged anywhere shows up in the frame total only.
+    '''
+    def __init__(self, window=270, trace=False):
+        self.histograms = {name: RollingHistogram(window) for name in SECTIONS + ('frame',)}
+        self.trace = [] if trace else None
+        self.current = dict.fromkeys(SECTIONS, 0.0)
+        self.start = self.last = time.perf_counter()
+        self.frames = 0
+
+    def begin(self):
+        self.current = dict.fromkeys(SECTIONS, 0.0)
+        self.start = self.last = time.perf_counter()
+
+    def mark(self, section):
+        now = time.perf_counter()
+        self.current[section] += now - self.last
+        self.last = now
+
+    def end(self):
+        frame = dict((name, seconds * 1000.0) for name, seconds in self.current.items())
+        frame['frame'] = (time.perf_counter() - self.start) * 1000.0
+        for name, ms in frame.items():
+            self.histograms[name].add(ms)
+        self.frames += 1
+        if self.trace is not None:
+            frame['index'] = self.frames
+            self.trace.append(frame)
+
+    def report(self):
+        ''' {section: (p50, p95, p99)} in milliseconds over the rolling window '''
+        return {name: tuple(histogram.percentile(p) for p in (50, 95, 99))
+                for name, histogram in self.histograms.items()}
+
+    def dump(self, path):
+        ''' Writes the per-frame trace as CSV or, for a .json path, JSON '''
+        fields = ('index',) + SECTIONS + ('frame',)
+        with open(path, 'w', newline='') as f:
+            if path.endswith('.json'):
+                json.dump(self.trace or [], f)
+            else:
+                writer = csv.DictWriter(f, fields)
+                writer.writeheader()
+                writer.writerows(self.trace or [])
+
+class Overlay:
+    ''' Percentile table drawn over the game, refreshed a few times a second '''
+    def __init__(self, profiler, font, position=(10, 310), refresh=0.5):
+        self.profiler = profiler
+        self.font = font
+        self.position = position
+        self.refresh = refresh
+        self.visible = False
+        self.surface = None
+        self.updated = 0.0
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.surface = None
+
+    def image(self):
+        now = time.perf_counter()
+        if self.surface is None or now - self.updated > self.refresh:
+            lines = ['%-10s %6s %6s %6s' % ('ms', 'p50', 'p95', 'p99')]
+            for name, values in self.profiler.report().items():
+                lines.append('%-10s %6.2f %6.2f %6.2f' % ((name,) + values))
+            rendered = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+            height = self.font.get_linesize()
+            self.surface = pygame.Surface((max(r.get_width() for r in rendered) + 10,
+                                           height * len(rendered) + 10))
+            self.surface.fill((0, 0, 0))
+            for i, line in enumerate(rendered):
+                self.surface.blit(line, (5, 5 + i * height))
+            self.updated = now
+        return self.surface
@@ -0,0 +1,167 @@
+''' Structure of arrays projectile pool, every live projectile is updated in one batch '''
+import heapq
+
+import numpy as np
+
+#One live projectile in a snapshot, little endian
+RECORD = np.dtype([('slot', '<u2'), ('x', '<i4'), ('y', '<i4'), ('vel', '<i4'),
+                   ('radius', '<i4'), ('owner', 'i1'), ('colour', 'u1', 3)])
+#hits() tests every (target, projectile) pair at once up to PAIRWISE pairs or below BROAD_TARGETS targets,
+#past both the broad phase's sort costs less than it saves
+PAIRWISE = 4096
+BROAD_TARGETS = 8
+
+class ProjectilePool:
+    ''' Preallocated NumPy columns per projectile field plus a free list of slots
+
+    Slots are handed out lowest first and stay stable while the projectile
+    lives, so they double as keys for the renderer.
+    '''
+    def __init__(self, capacity=32):
+        self.capacity = 0
+        self.x = np.zeros(0, np.int32)
+        self.y = np.zeros(0, np.int32)
+        self.vel = np.zeros(0, np.int32)
+        self.radius = np.zeros(0, np.int32)
+        self.owner = np.zeros(0, np.int8)
+        self.colour = np.zeros((0, 3), np.uint8)
+        self.alive = np.zeros(0, bool)
+        self.free = []
+        self.count = 0
+        self.grow(capacity)
+
+    def grow(self, capacity):
+        old = self.capacity
+        for name in ('x', 'y', 'vel', 'radius', 'owner', 'colour', 'alive'):
+            column = getattr(self, name)
+            grown = np.zeros((capacity,) + column.shape[1:], column.dtype)
+            grown[:old] = column
+            setattr(self, name, grown)
+        #free is a min heap so the lowest slot is used first, the new slots are above every old one
+        self.free.extend(range(old, capacity))
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, radius, colour, facing, owner=1):
+        if not self.free:
+            self.grow(self.capacity * 2)
+        slot = heapq.heappop(self.free)
+        self.x[slot] = x
+        self.y[slot] = y
+        self.vel[slot] = 10 * facing
+        self.radius[slot] = radius
+        self.owner[slot] = owner
+        self.colour[slot] = colour
+        self.alive[slot] = True
+        self.count += 1
+        return slot
+
+    def release(self, slots):
+        if not len(slots):
+            return
+        slots = [slot for slot in slots if self.alive[slot]]
+        self.alive[slots] = False
+        for slot in slots:
+            heapq.heappush(self.free, slot)
+        self.count -= len(slots)
+
+    def clear(self):
+        self.release(self.live().tolist())
+
+    def live(self):
+        return np.flatnonzero(self.alive)
+
+    def hits(self, targets):
+        ''' Returns [(slot, target key)] for live projectiles overlapping a target
+
+        targets maps key -> (x, y, w, h) and is tested in order, a projectile
+        hits at most one target and never its owner. Touching edges don't count.
+
+        Broad phase: live projectiles are sorted by x, so the only ones that can
+        reach a target are one searchsorted() span of that order. The spans of
+        every target are laid end to end and only those (target, projectile)
+        pairs get the exact overlap test, in one go. Small matches, like two
+        players and their shots, test every pair as one array instead.
+        '''
+        slots = self.live()
+        if not slots.size or not targets:
+            return []
+        x, y, r = self.x[slots], self.y[slots], self.radius[slots]
+        keys = np.array(list(targets))
+        tx, ty, tw, th = np.array(list(targets.values()), np.int64).reshape(-1, 4).T
+        if slots.size*keys.size <= PAIRWISE or keys.size < BROAD_TARGETS:
+            owner = self.owner[slots]
+            hit = ((owner != keys[:, None]) & (x - r < (tx + tw)[:, None]) & (x + r > tx[:, None])
+                   & (y - r < (ty + th)[:, None]) & (y + r > ty[:, None]))
+            if not hit.any():
+                return []
+            hit &= np.cumsum(hit, axis=0) == 1#Each projectile goes to the first target it hits
+            target, near = np.nonzero(hit)
+            return list(zip(slots[near].tolist(), keys[target].tolist()))
+
+        order = np.argsort(x, kind='stable')
+        reach = int(r.max())#Furthest a centre can be outside a target and still overlap it
+        sortedX = x[order]
+        starts = np.searchsorted(sortedX, tx - reach, 'right')
+        counts = np.maximum(np.searchsorted(sortedX, tx + tw + reach, 'left') - starts, 0)
+        total = int(counts.sum())
+        if not total:
+            return []
+        target = np.repeat(np.arange(keys.size), counts)
+        near = order[np.arange(total) + np.repeat(starts - (np.cumsum(counts) - counts), counts)]
+        nx, ny, nr = x[near], y[near], r[near]
+        hit = ((self.owner[slots[near]] != keys[target]) & (nx - nr < (tx + tw)[target]) & (nx + nr > tx[target])
+               & (ny - nr < (ty + th)[target]) & (ny + nr > ty[target]))
+        if not hit.any():
+            return []
+        target, near = target[hit], near[hit]
+        #Each projectile goes to the first target it hits, then hits are listed by target and slot
+        first = np.lexsort((target, near))
+        near, target = near[first], target[first]
+        keep = np.ones(near.size, bool)
+        keep[1:] = near[1:] != near[:-1]
+        near, target = near[keep], target[keep]
+        listed = np.lexsort((near, target))
+        return list(zip(slots[near[listed]].tolist(), keys[target[listed]].tolist()))
+
+    def cull(self, width):
+        ''' Releases projectiles outside 0 < x < width, returns how many went '''
+        slots = self.live()
+        x = self.x[slots]
+        outside = slots[(x <= 0) | (x >= width)].tolist()
+        self.release(outside)
+        return len(outside)
+
+    def advance(self):
+        self.x[self.alive] += self.vel[self.alive]
+
+    def snapshot(self):
+        ''' The live projectiles as bytes of RECORD structs '''
+        slots = self.live()
+        records = np.empty(slots.size, RECORD)
+        records['slot'] = slots
+        for name in ('x', 'y', 'vel', 'radius', 'owner', 'colour'):
+            records[name] = getattr(self, name)[slots]
+        return records.tobytes()
+
+    def restore(self, data, capacity=0):
+        ''' Replaces every projectile with the ones in a snapshot() '''
+        records = np.frombuffer(data, RECORD)
+        slots = records['slot'].astype(np.intp)
+        needed = max(capacity, int(slots.max()) + 1 if slots.size else 0)
+        if needed > self.capacity:
+            self.grow(needed)
+        self.alive[:] = False
+        self.alive[slots] = True
+        for name in ('x', 'y', 'vel', 'radius', 'owner', 'colour'):
+            getattr(self, name)[slots] = records[name]
+        self.free = np.flatnonzero(~self.alive).tolist()#Ascending, already a heap
+        self.count = slots.size
+
+    def rows(self):
+        ''' Plain (slot, x, y, radius, colour) tuples of every live projectile, for drawing '''
+        slots = self.live()
+        return list(zip(slots.tolist(), self.x[slots].tolist(), self.y[slots].tolist(),
+                        self.radius[slots].tolist(), map(tuple, self.colour[slots].tolist())))
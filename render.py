@@ -0,0 +1,103 @@
+''' Dirty rectangle renderer, repaints and uploads only the regions that changed '''
+import pygame
+
+class Renderer:
+    ''' Retained mode drawing onto a display.Viewport over a static background.
+
+    Every frame the caller hands present() the full back to front list of
+    (key, rect, signature, draw) items. Items whose signature changed, appeared
+    or disappeared mark their old and new rects dirty, only those regions are
+    repainted and only those rects are passed to pygame.display.update().
+    Rects are in logical coordinates, the viewport scales them to the window.
+    Which items a dirty rect repaints is decided on their window rects, at a
+    fractional scale those are rounded outwards and can touch where the
+    logical rects don't.
+    draw is a callable, or an (image, position) pair for plain sprites, and
+    runs of sprites go to the viewport as one blits() call.
+    '''
+    def __init__(self, view, bg):
+        self.view = view
+        self.bg = bg
+        self.items = {}#Key -> item drawn in the last frame
+        self.full = True
+        self.profiler = None#Optional profiler.FrameProfiler
+
+    def invalidate(self):
+        ''' Forces a full repaint, for when another screen drew over the game '''
+        self.full = True
+
+    def dirtyRects(self, items):
+        previous = self.items
+        dirty = []
+        for key, rect, signature, draw in items:
+            old = previous.get(key)
+            if old is None:
+                dirty.append(rect)
+            elif old[2] != signature or old[1] != rect:
+                dirty.append(rect.union(old[1]))
+        keys = {item[0] for item in items}
+        for key, old in previous.items():
+            if key not in keys:
+                dirty.append(old[1])
+        bounds = self.view.get_rect()
+        return [rect for rect in (r.clip(bounds) for r in dirty) if rect.w and rect.h]
+
+    def draw(self, items):
+        ''' Draws items back to front, batching consecutive sprites '''
+        batch = []
+        for item in items:
+            draw = item[3]
+            if type(draw) is tuple:
+                batch.append(draw)
+                continue
+            if batch:
+                self.view.blits(batch)
+                batch = []
+            draw()
+        if batch:
+            self.view.blits(batch)
+
+    def present(self, items):
+        view = self.view
+        if self.full:
+            view.clear()
+            view.set_clip(view.get_rect())#Nothing may land in the borders, the dirty path never clears them
+            view.blit(self.bg, (0, 0))
+            self.draw(items)
+            view.set_clip(None)
+            dirty = [view.get_rect()]
+            self.full = False
+        else:
+            dirty = self.dirtyRects(items)
+            if dirty:
+                toWindow = view.toWindow
+                rects = [toWindow(item[1]) for item in items]
+            for area in dirty:
+                view.set_clip(area)
+                view.restore(self.bg, area)
+                window = toWindow(area)
+                self.draw([item for item, rect in zip(items, rects) if rect.colliderect(window)])
+            view.set_clip(None)
+        self.items = {item[0]: item for item in items}
+        if self.profiler: self.profiler.mark('render')
+        view.update(dirty)
+        if self.profiler: self.profiler.mark('display')
+        return dirty
+
+def sprite(view, key, image, position):
+    ''' Renderer item for a surface blitted at position '''
+    rect = image.get_rect(topleft=position)
+    return (key, rect, image, (image, position))
+
+def healthBar(view, key, x, y, width, lost, perPoint):
+    ''' Renderer item for a red bar covered in green by the health that is left '''
+    rect = pygame.Rect(x, y, width, 10)
+    def draw():
+        view.fill((255,0,0), (x, y, width, 10))
+        view.fill((0,128,0), (x, y, width - perPoint*lost, 10))
+    return (key, rect, lost, draw)
+
+def circle(view, key, x, y, radius, colour):
+    ''' Renderer item for a projectile outline '''
+    rect = pygame.Rect(x - radius - 1, y - radius - 1, 2*radius + 3, 2*radius + 3)
+    return (key, rect, colour, lambda: view.circle(colour, (x, y), radius, 1))
@@ -0,0 +1,112 @@
+''' Records the per-tick input masks of a match and plays them back through the engine
+
+File layout, little endian: the header struct below, both player names as utf-8,
+then one pair of uint16 input masks (player 1, player 2) per tick until the end
+of the file. The header holds a hash of the roster and arena rules the match was
+played with, a recording only plays back the same under those. Bump VERSION when
+the engine's own rules change.
+'''
+import argparse
+import hashlib
+import json
+import struct
+import sys
+import time
+from array import array
+
+import engine
+
+MAGIC = b'JGRP'
+VERSION = 2
+HEADER = struct.Struct('<4sB8sHH')#Magic, version, rules hash, name lengths
+#The game.json character fields the engine plays by, the rest only change how a match looks
+RULES = ('start', 'size', 'facingLeft', 'speed', 'health', 'damage', 'fist', 'cheats', 'shootCooldown', 'punchTicks')
+
+def rules(game=None):
+    ''' 8 byte hash of the arena and every character's RULES in game, game.json's by default '''
+    game = game or engine.GAME
+    roster = [[c[field] for field in RULES] + [len(c['walkLeft'])] for c in game['characters']]
+    return hashlib.sha1(json.dumps([game['arena'], roster], sort_keys=True).encode('utf-8')).digest()[:8]
+
+class Recorder:
+    ''' Appends every tick's inputs, flushing to disk every few hundred ticks '''
+    def __init__(self, path, names=('', ''), flushEvery=256):
+        self.file = open(path, 'wb')
+        encoded = [name.encode('utf-8') for name in names]
+        self.file.write(HEADER.pack(MAGIC, VERSION, rules(), len(encoded[0]), len(encoded[1])))
+        self.file.write(b''.join(encoded))
+        self.buffer = array('H')
+        self.flushEvery = flushEvery
+
+    def record(self, inputs):
+        self.buffer.extend(inputs)
+        if len(self.buffer) >= 2*self.flushEvery:
+            self.flush()
+
+    def flush(self):
+        if sys.byteorder == 'big':
+            self.buffer.byteswap()
+        self.buffer.tofile(self.file)
+        self.buffer = array('H')
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+class Recording:
+    def __init__(self, names, masks):
+        self.names = names
+        self.masks = masks#Flat array, player 1 and player 2 interleaved
+
+    def __len__(self):
+        return len(self.masks)//2
+
+    def __iter__(self):
+        masks = iter(self.masks)
+        return zip(masks, masks)
+
+def load(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:4] != MAGIC or data[4:5] != bytes((VERSION,)) or len(data) < HEADER.size:#Older headers are shorter
+        raise ValueError('%s is not a version %d Jumping Game recording' % (path, VERSION))
+    magic, version, played, length1, length2 = HEADER.unpack_from(data)
+    if played != rules():
+        raise ValueError('%s was recorded with different characters or arena than game.json has' % path)
+    start = HEADER.size
+    names = (data[start:start+length1].decode('utf-8'),
+             data[start+length1:start+length1+length2].decode('utf-8'))
+    start += length1 + length2
+    masks = array('H')
+    masks.frombytes(data[start:len(data) - (len(data) - start) % 4])
+    if sys.byteorder == 'big':
+        masks.byteswap()
+    return Recording(names, masks)
+
+def simulate(recording, state=None):
+    ''' Runs the whole recording through the engine as fast as possible '''
+    state = state or engine.GameState()
+    step = engine.step
+    for inputs in recording:
+        step(state, inputs)
+    return state
+
+def main():
+    parser = argparse.ArgumentParser(description='Replays a recorded match without rendering')
+    parser.add_argument('recording')
+    args = parser.parse_args()
+
+    recording = load(args.recording)
+    start = time.perf_counter()
+    state = simulate(recording)
+    elapsed = time.perf_counter() - start
+    winner = state.winner()
+    print('%d ticks in %.3fs (%.0f ticks/s)' % (len(recording), elapsed, len(recording)/max(elapsed, 1e-9)))
+    print('%s: %d health, %s: %d health, winner: %s' % (
+        recording.names[0], state.p1.health, recording.names[1], state.p2.health,
+        recording.names[winner-1] if winner else 'none'))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+''' Menu, controls and pause screens, run by an event driven scene loop
+
+A scene only repaints when it marks itself dirty, and between repaints the
+loop sleeps in pygame.event.wait() instead of spinning, so an idle menu or
+pause screen costs next to no CPU.
+'''
+import pygame
+
+import assets
+import config
+import display
+import fonts
+from ui import Button, InputBox, exitGame
+
+clock = pygame.time.Clock()#Frame rate limiter shared with the game loop
+
+class Scene:
+    timeout = None#Milliseconds between tick() calls, None sleeps until an event
+
+    def __init__(self, screen, bg):
+        self.screen = screen
+        self.bg = bg
+        self.dirty = True
+        self.done = False
+        self.result = None
+
+    def draw(self):
+        pass
+
+    def handle(self, event):
+        pass
+
+    def tick(self):
+        ''' Called when timeout passes without an event, for animations '''
+        pass
+
+    def finish(self, result=None):
+        self.done = True
+        self.result = result
+
+def run(scene, fps=27):
+    ''' Runs scene until it finishes and returns its result '''
+    motionBlocked = pygame.event.get_blocked(pygame.MOUSEMOTION)
+    pygame.event.set_blocked(pygame.MOUSEMOTION)#No scene reacts to it, so don't wake up for it
+    try:
+        while not scene.done:
+            if scene.dirty:
+                scene.draw()
+                display.present(scene.screen)
+                scene.dirty = False
+                clock.tick(fps)
+            event = pygame.event.wait(scene.timeout) if scene.timeout else pygame.event.wait()
+            if event.type == pygame.NOEVENT:
+                scene.tick()
+                continue
+            for event in [event] + pygame.event.get():
+                scene.handle(display.logicalEvent(event))
+                if scene.done:
+                    break
+    finally:
+        if not motionBlocked:
+            pygame.event.set_allowed(pygame.MOUSEMOTION)
+    return scene.result
+
+def portraits():
+    ''' The characters' pictures from game.json '''
+    return [assets.image(c['portrait'], c['folder']) for c in config.load()['characters']]
+
+class ControlScreen(Scene):
+    def __init__(self, screen, bg, textFg=(255, 0, 0)):
+        super().__init__(screen, bg)
+        self.title = assets.image('controls.png')
+        self.font = fonts.font('Didot', 40)
+        self.textFg = textFg
+        self.controls = config.load()['controls']#One list of lines per column
+        self.backBtn = None
+
+    def draw(self):
+        self.screen.blit(self.bg, (0, 0))
+        self.screen.blit(self.title, (225, 0))
+        xStart = 70
+        yStart = 100
+        for i, column in enumerate(self.controls):
+            for j, line in enumerate(column):
+                text_render = fonts.render(self.font, line, 1, self.textFg)
+                self.screen.blit(text_render, (xStart + i*400, yStart + j*40))
+        self.backBtn = Button(self.screen, (0, 0), '\u2190', pad=2)
+        pygame.draw.line(self.screen, (255, 0, 0), (400, 100),
+                         (400, self.screen.get_height()-25), 3)
+
+    def handle(self, event):
+        if event.type == pygame.QUIT:
+            exitGame()
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                exitGame()
+            key_to_start = (event.key in [pygame.K_s, pygame.K_RIGHT,
+                                          pygame.K_UP, pygame.K_RETURN,
+                                          pygame.K_BACKSPACE])
+            if key_to_start:
+                self.finish()
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.backBtn.clicked():
+                self.finish()
+
+class MenuScreen(Scene):
+    ''' Game start screen, returns the player names
+
+    With idle set, returns None once nobody has typed or clicked for that many
+    milliseconds.
+    '''
+    def __init__(self, screen, bg, title, idle=None):
+        super().__init__(screen, bg)
+        self.timeout = idle
+        self.title = title
+        self.player1_img, self.player2_img = portraits()
+        self.entryWidgets = [InputBox(40, 100, 200, 75, 'Enter name'),
+                             InputBox(560, 100, 200, 75, 'Enter name')]
+        self.startBtn = self.controlsBtn = self.quitBtn = None
+
+    def draw(self):
+        #Blitting images
+        self.screen.blit(self.bg, (0, 0))
+        self.screen.blit(self.title, (160, 0))
+        self.screen.blit(self.player1_img, (50, 210))
+        self.screen.blit(self.player2_img, (550, 220))
+        #Drawing button widgets
+        self.startBtn = Button(self.screen, (300, 200), 'Start', pad=15)
+        self.controlsBtn = Button(self.screen, (295, 275), 'Controls', pad=10)
+        self.quitBtn = Button(self.screen, (300, 350), 'Quit', pad=15)
+        for entryWidget in self.entryWidgets:
+            entryWidget.update()
+            entryWidget.draw(self.screen)
+
+    def handle(self, event):
+        if event.type == pygame.QUIT:
+            exitGame()
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            exitGame()
+        if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+            [entryWidget.handle_event(event) for entryWidget in self.entryWidgets]
+            self.dirty = True
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.quitBtn.clicked():
+                exitGame()
+            elif self.startBtn.clicked():
+                values = self.getPlayerNames()
+                #Checking if values Exist
+                if all(values):
+                    self.finish(values)
+            elif self.controlsBtn.clicked():
+                run(ControlScreen(self.screen, self.bg))
+                self.dirty = True
+
+    def tick(self):
+        self.finish(None)
+
+    def getPlayerNames(self):
+        return [e.val for e in self.entryWidgets]
+
+class PauseScreen(Scene):
+    ''' Returns True when the player asked for the match to be reset '''
+    def __init__(self, screen, bg):
+        super().__init__(screen, bg)
+        self.title = assets.image('paused.png')
+        self.player1_img, self.player2_img = portraits()
+        self.font = fonts.font('Garamond', 50)
+        self.reset = False
+        self.aboutToggle = False
+        self.resumeBtn = self.resetBtn = self.quitBtn = self.aboutBtn = None
+
+    def draw(self):
+        self.screen.blit(self.bg, (0, 0))
+        self.screen.blit(self.title, (300, 40))
+        self.screen.blit(self.player1_img, (50, 210))
+        self.screen.blit(self.player2_img, (550, 220))
+        self.resumeBtn = Button(self.screen, (320, 150), 'Resume', pad=10)
+        self.resetBtn = Button(self.screen, (320, 210), 'Reset', pad=14)
+        self.quitBtn = Button(self.screen, (320, 270), 'Quit', pad=15)
+        self.aboutBtn = Button(self.screen, (320, 330), 'About', pad=12)
+        if self.aboutToggle:
+            text_render = fonts.render(self.font, 'Created By: Sanvit Katrekar', 1, (255, 0, 0))
+            self.screen.blit(text_render, (150, 400))
+
+    def handle(self, event):
+        if event.type == pygame.QUIT:
+            exitGame()
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                exitGame()
+            key_to_start = (event.key in [pygame.K_s, pygame.K_RETURN])
+            if key_to_start:
+                self.finish(self.reset)
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.resumeBtn.clicked():
+                self.finish(self.reset)
+            elif self.resetBtn.clicked():
+                self.reset = True
+                self.finish(self.reset)
+            elif self.aboutBtn.clicked():
+                self.aboutToggle = not self.aboutToggle
+                self.dirty = True
+            elif self.quitBtn.clicked():
+                exitGame()
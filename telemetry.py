@@ -0,0 +1,226 @@
+''' Match events into a preallocated ring buffer, written to rotating files by a background thread
+
+The game thread only stores a few ints per event and never touches the disk,
+when the ring is full events are dropped and counted rather than waited on.
+Events come from comparing each player after every tick with the tick before,
+so the engine stays as it is. health changes are logged with both players'
+health, enough to rebuild health1 and health2 for every tick.
+
+A .jgtl path gets the compact binary layout, little endian: the header
+struct below then one RECORD per event. Anything else is NDJSON, one object
+per line, and every file starts with a session line holding the wall clock
+time that the time fields count from. Decode a binary file to NDJSON with
+
+    python telemetry.py telemetry.jgtl
+'''
+import argparse
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+
+MAGIC = b'JGTL'
+VERSION = 1
+HEADER = struct.Struct('<4sBd')#Magic, version, unix time the session started
+FIELDS = ('time', 'tick', 'event', 'player', 'value', 'extra')#time is ms since the session started
+RECORD = struct.Struct('<%di' % len(FIELDS))
+
+#Event kinds, what value and extra hold is noted after each
+SESSION, SHOT, HIT, HEALTH, JUMP, FLY, DEATH, RESET, SPIKE, DROPPED, RESTART = range(11)
+EVENTS = ('session', 'shot', 'hit', 'health', 'jump', 'fly', 'death', 'reset', 'spike', 'dropped', 'restart')
+#SHOT: shots so far. HIT: damage, attacker. HEALTH: health1, health2. FLY: 1 on, 0 off.
+#RESET: one of RESET_FROM. SPIKE: frame time in microseconds. DROPPED: events lost to a full ring.
+#RESTART: one of RESTART_FOR, the memory in MB or frame rate that broke the limit
+RESET_FROM = ('key', 'pause', 'playAgain')
+RESTART_FOR = ('memory', 'fps', 'player')
+
+class Ring:
+    ''' Fixed size queue of records, for one thread putting and one taking
+
+    Only put() moves head and only take() moves tail, so neither needs a lock.
+    '''
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.data = array('i', bytes(RECORD.size*capacity))
+        self.head = self.tail = 0#Records ever put and taken
+        self.dropped = 0
+
+    def put(self, t, tick, event, player=0, value=0, extra=0):
+        if self.head - self.tail >= self.capacity:
+            self.dropped += 1
+            return
+        data = self.data
+        i = (self.head % self.capacity)*len(FIELDS)
+        data[i] = t; data[i+1] = tick; data[i+2] = event
+        data[i+3] = player; data[i+4] = value; data[i+5] = extra
+        self.head += 1#Last, the record is complete before take() can see it
+
+    def take(self):
+        ''' Every record put since the last take(), as one flat array '''
+        head, tail = self.head, self.tail
+        if head == tail:
+            return array('i')
+        start, end = (tail % self.capacity)*len(FIELDS), (head % self.capacity)*len(FIELDS)
+        if start < end:
+            taken = self.data[start:end]
+        else:#Wrapped around the end
+            taken = self.data[start:] + self.data[:end]
+        self.tail = head
+        return taken
+
+class RotatingFile:
+    ''' Output file renamed to path.1, path.2 and so on once it reaches maxBytes, keeping backups of them '''
+    def __init__(self, path, started, maxBytes=1 << 20, backups=5):
+        self.path = path
+        self.started = started
+        self.binary = path.endswith('.jgtl')
+        self.maxBytes = maxBytes
+        self.backups = backups
+        self.file = None
+        self.open()
+
+    def open(self):
+        self.file = open(self.path, 'wb')
+        if self.binary:
+            self.file.write(HEADER.pack(MAGIC, VERSION, self.started))
+        else:
+            self.file.write(json.dumps({'event': 'session', 'unix': self.started}).encode('utf-8') + b'\n')
+
+    def rotate(self):
+        self.file.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists('%s.%d' % (self.path, i)):
+                os.replace('%s.%d' % (self.path, i), '%s.%d' % (self.path, i + 1))
+        if self.backups:
+            os.replace(self.path, self.path + '.1')
+        self.open()
+
+    def write(self, records):
+        if self.binary:
+            if sys.byteorder == 'big':
+                records.byteswap()
+            self.file.write(records.tobytes())
+        else:
+            lines = []
+            for i in range(0, len(records), len(FIELDS)):
+                record = dict(zip(FIELDS, records[i:i+len(FIELDS)]))
+                record['event'] = EVENTS[record['event']]
+                lines.append(json.dumps(record) + '\n')
+            self.file.write(''.join(lines).encode('utf-8'))
+        self.file.flush()
+        if self.file.tell() >= self.maxBytes:
+            self.rotate()
+
+    def close(self):
+        self.file.close()
+
+class Telemetry:
+    ''' Event bus for one match session, observe(state) after every tick and close() at the end
+
+    spike is the frame time in seconds above which frame() logs a SPIKE.
+    '''
+    def __init__(self, path, capacity=4096, interval=0.5, spike=0.05, maxBytes=1 << 20, backups=5):
+        self.ring = Ring(capacity)
+        self.start = time.perf_counter()
+        self.output = RotatingFile(path, time.time(), maxBytes, backups)
+        self.spike = spike
+        self.tick = 0
+        self.last = None#Per player (health, shots, isJump, isFly, alive) after the last tick
+        self.reported = 0#Drops already written out
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.flusher, args=(interval,), name='telemetry', daemon=True)
+        self.thread.start()
+
+    def event(self, event, player=0, value=0, extra=0):
+        self.ring.put(int((time.perf_counter() - self.start)*1000), self.tick, event, player, value, extra)
+
+    def observe(self, s):
+        ''' Logs what changed in s since the last call '''
+        self.tick = s.ticks
+        now = [(p.health, p.shots, p.isJump, p.isFly, p.alive) for p in s.players]
+        last = self.last
+        self.last = now
+        if last is None or now == last:
+            return
+        healthChanged = False
+        for number, (before, after) in enumerate(zip(last, now), 1):
+            if before == after:
+                continue
+            health, shots, isJump, isFly, alive = after
+            if health != before[0]:
+                healthChanged = True
+                if health < before[0]:#Only the other player can hurt this one
+                    self.event(HIT, number, before[0] - health, 3 - number)
+            if shots > before[1]:
+                self.event(SHOT, number, shots)
+            if isJump and not before[2]:
+                self.event(JUMP, number)
+            if isFly != before[3]:
+                self.event(FLY, number, int(isFly))
+            if before[4] and not alive:
+                self.event(DEATH, number)
+        if healthChanged:
+            self.event(HEALTH, 0, now[0][0], now[1][0])
+
+    def reset(self, source):
+        ''' Logs a restart, source being one of RESET_FROM '''
+        self.event(RESET, 0, RESET_FROM.index(source))
+
+    def restart(self, reason, measured=0):
+        ''' Logs the game restarting itself, reason being one of RESTART_FOR '''
+        self.event(RESTART, 0, RESTART_FOR.index(reason), int(measured))
+
+    def frame(self, seconds):
+        ''' Logs a SPIKE for a frame that took longer than spike seconds '''
+        if seconds > self.spike:
+            self.event(SPIKE, 0, int(seconds*1000000))
+
+    def flush(self):
+        records = self.ring.take()
+        dropped = self.ring.dropped
+        if dropped != self.reported:
+            records.extend((int((time.perf_counter() - self.start)*1000), self.tick, DROPPED, 0, dropped - self.reported, 0))
+            self.reported = dropped
+        if records:
+            self.output.write(records)
+
+    def flusher(self, interval):
+        while not self.stopping.wait(interval):
+            self.flush()
+
+    def close(self):
+        ''' Stops the flusher and writes what is left '''
+        if not self.stopping.is_set():
+            self.stopping.set()
+            self.thread.join()
+            self.flush()
+            self.output.close()
+
+def load(path):
+    ''' (unix start time, [record dicts]) from a binary telemetry file '''
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, started = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('%s is not a version %d Jumping Game telemetry file' % (path, VERSION))
+    records = []
+    for values in RECORD.iter_unpack(data[HEADER.size:len(data) - (len(data) - HEADER.size) % RECORD.size]):
+        record = dict(zip(FIELDS, values))
+        record['event'] = EVENTS[record['event']]
+        records.append(record)
+    return started, records
+
+def main():
+    parser = argparse.ArgumentParser(description='Prints a binary telemetry file as NDJSON')
+    parser.add_argument('file')
+    args = parser.parse_args()
+    started, records = load(args.file)
+    sys.stdout.write(json.dumps({'event': 'session', 'unix': started}) + '\n')
+    for record in records:
+        sys.stdout.write(json.dumps(record) + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+''' The planner has to stay inside its time budget, garbage collections included '''
+import gc
+import random
+import time
+
+import pytest
+
+import ai
+import engine
+from runner import chasePolicy
+
+@pytest.fixture
+def slowCollections():
+    ''' Every collection takes 5 ms, like a full one in the game, and they come as often as they can '''
+    def slow(phase, info):
+        if phase == 'start':
+            end = time.perf_counter() + 0.005
+            while time.perf_counter() < end:
+                pass
+    threshold = gc.get_threshold()
+    gc.set_threshold(10, 1, 1)
+    gc.callbacks.append(slow)
+    yield
+    gc.callbacks.remove(slow)
+    gc.set_threshold(*threshold)
+
+def test_choose_keeps_to_its_budget(slowCollections):
+    budget = 0.004
+    planner = ai.Planner(2, budget)
+    rng = random.Random(0)
+    s = engine.GameState()
+    overruns = 0
+    opponent = 0
+    for tick in range(60):
+        start = time.perf_counter()
+        mine = planner.choose(s, opponent)
+        #Jumping Game.py leaves the planner 4 ms less than the frame has
+        overruns += time.perf_counter() - start - budget > 0.004
+        opponent = chasePolicy(s, 1, rng)
+        engine.step(s, (opponent, mine))
+    assert gc.isenabled()
+    assert overruns <= 2#The odd one to the machine's scheduler
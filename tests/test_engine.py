@@ -0,0 +1,31 @@
+''' Snapshots have to bring back every player, however many the state held before '''
+import engine
+
+def roster(count):
+    characters = engine.GAME['characters']
+    return [characters[i % len(characters)] for i in range(count)]
+
+def test_restore_resizes_the_roster():
+    three = engine.GameState(roster(3))
+    three.players[2].health = 3
+    three.p2.x = 123
+    snapshot = three.snapshot()
+
+    two = engine.GameState()
+    two.restore(snapshot)
+    assert len(two.players) == 3
+    assert two.p1 is two.players[0] and two.p2 is two.players[1]
+    assert two.p2.x == 123 and two.players[2].health == 3
+    assert two.snapshot() == snapshot
+
+    two.restore(engine.GameState().snapshot())
+    assert len(two.players) == 2
+    assert two.p1 is two.players[0] and two.p2 is two.players[1]
+    assert [number for number, p in two.targets] == [number for number, p in engine.GameState().targets]
+    engine.step(two, (engine.RIGHT, engine.LEFT))
+    assert two.ticks == 1
+
+def test_shortcuts_follow_the_players():
+    s = engine.GameState(roster(3))
+    assert s.p1 is s.players[0] and s.p2 is s.players[1]
+    assert engine.statTarget(s, 'speed') == (s.p1, 'speed')
@@ -0,0 +1,44 @@
+''' ProjectilePool's grid broad phase has to find exactly the hits a test of every pair would '''
+import random
+
+import pytest
+
+import projectiles
+from projectiles import ProjectilePool
+
+def everyPair(pool, targets):
+    found, taken = [], set()
+    for key, (tx, ty, tw, th) in targets.items():
+        for slot in pool.live().tolist():
+            x, y, r = int(pool.x[slot]), int(pool.y[slot]), int(pool.radius[slot])
+            if (slot not in taken and pool.owner[slot] != key and x - r < tx + tw and x + r > tx
+                    and y - r < ty + th and y + r > ty):
+                found.append((slot, key))
+                taken.add(slot)
+    return found
+
+@pytest.fixture(params=['pairwise', 'broad'])
+def phase(request, monkeypatch):
+    if request.param == 'broad':
+        monkeypatch.setattr(projectiles, 'PAIRWISE', 0)
+        monkeypatch.setattr(projectiles, 'BROAD_TARGETS', 0)
+    return request.param
+
+def test_hits_match_every_pair(phase):
+    rng = random.Random(5)
+    for trial in range(300):
+        pool = ProjectilePool(4)
+        for i in range(rng.choice((1, 3, 40, 300))):
+            pool.spawn(rng.randint(-50, 900), rng.randint(-100, 500), rng.randint(1, 40), (0, 0, 0),
+                       rng.choice((-1, 1)), owner=rng.randint(1, 4))
+        pool.release(rng.sample(pool.live().tolist(), len(pool)//4))
+        targets = {key: (rng.randint(-60, 880), rng.randint(-120, 470), rng.randint(0, 200), rng.randint(0, 200))
+                   for key in range(1, rng.randint(2, 6))}
+        assert pool.hits(targets) == everyPair(pool, targets)
+
+def test_touching_edges_miss(phase):
+    pool = ProjectilePool()
+    pool.spawn(100, 100, 10, (0, 0, 0), 1, owner=1)
+    assert pool.hits({2: (110, 80, 20, 40)}) == []
+    assert pool.hits({2: (109, 80, 20, 40)}) == [(0, 2)]
+    assert pool.hits({1: (95, 95, 10, 10)}) == []#Never its owner
@@ -0,0 +1,70 @@
+''' The dirty rectangle path has to leave the window exactly as a full repaint would '''
+import random
+
+import numpy as np
+import pygame
+import pytest
+
+from display import Viewport
+from render import Renderer, sprite, healthBar, circle
+
+@pytest.fixture(scope='module', autouse=True)
+def display():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))#update() needs a display, the viewports below draw on plain surfaces
+    yield
+    pygame.display.quit()
+
+def background():
+    #Wider than the logical size like bg.jpg, so a full repaint has something to spill into the borders
+    pixels = np.random.RandomState(1).randint(0, 256, (852, 480, 3)).astype(np.uint8)
+    return pygame.surfarray.make_surface(pixels)
+
+def frames(count, seed=1):
+    ''' Renderer item lists for count frames of things moving about, bumping into each other '''
+    rng = random.Random(seed)
+    image = pygame.Surface((37, 53))
+    image.fill((40, 90, 200))
+    things = [[rng.randrange(850), rng.randrange(480)] for i in range(12)]
+    for frame in range(count):
+        for thing in things:
+            thing[0] = min(849, max(0, thing[0] + rng.randint(-6, 6)))
+            thing[1] = min(479, max(0, thing[1] + rng.randint(-6, 6)))
+        lost = frame % 7
+        def make(view):
+            items = [healthBar(view, 'bar', 20, 20, 150, lost, 10), healthBar(view, 'bar2', 680, 20, 150, 6 - lost, 10)]
+            for i, (x, y) in enumerate(things):
+                if i % 3 == 0:
+                    items.append(sprite(view, i, image, (x, y)))
+                else:
+                    items.append(circle(view, i, x, y, 4 + i % 5, (255, 255, i*20)))
+            #Bullets touching a health bar's right edge from outside, and its bottom edge
+            items.append(circle(view, 'edge', 170 + 5 + frame % 3, 25, 5, (255, 255, 0)))
+            items.append(circle(view, 'under', 90, 30 + 6 + frame % 2, 5, (255, 0, 255)))
+            return items
+        yield make
+
+@pytest.mark.parametrize('size, integer', [((1920, 1080), False), ((1000, 600), False), ((1300, 800), True)])
+def test_dirty_frames_match_full_repaints(size, integer):
+    window = pygame.Surface(size)
+    view = Viewport(window, integer=integer)
+    renderer = Renderer(view, background())
+    fullWindow = pygame.Surface(size)
+    fullView = Viewport(fullWindow, integer=integer)
+    full = Renderer(fullView, background())
+    for number, make in enumerate(frames(40)):
+        renderer.present(make(view))
+        full.invalidate()
+        full.present(make(fullView))
+        assert pygame.image.tobytes(window, 'RGB') == pygame.image.tobytes(fullWindow, 'RGB'), 'frame %d' % number
+
+def test_full_repaint_leaves_the_borders_black():
+    window = pygame.Surface((1300, 800))
+    view = Viewport(window, integer=True)
+    Renderer(view, background()).present([circle(view, 'bullet', 849, 200, 5, (255, 255, 255))])
+    pixels = pygame.surfarray.array3d(window)
+    area = view.area
+    inside = pixels[area.left:area.right, area.top:area.bottom].copy()
+    pixels[area.left:area.right, area.top:area.bottom] = 0
+    assert not pixels.any()
+    assert inside.any()
@@ -0,0 +1,62 @@
+''' Fixed timestep accumulator, the game logic ticks at a steady rate whatever the frame rate '''
+import time
+
+import pygame
+
+class FixedTimestep:
+    ''' Turns elapsed real time into a whole number of logic ticks per frame
+
+    The time left over is exposed as alpha(), the fraction of a tick to
+    interpolate rendering by. In lockstep mode every frame is exactly one tick,
+    which is how the game ran before the frame rate was decoupled.
+    '''
+    def __init__(self, rate, maxTicks=5, lockstep=False):
+        self.dt = 1.0 / rate
+        self.maxTicks = maxTicks
+        self.lockstep = lockstep
+        self.accumulator = self.dt#So the first frame runs a tick straight away
+        self.last = None
+
+    def reset(self):
+        ''' Forgets time that passed outside the game, e.g. on the pause screen '''
+        self.last = time.perf_counter()
+
+    def advance(self):
+        ''' Returns how many ticks to run this frame '''
+        if self.lockstep:
+            return 1
+        now = time.perf_counter()
+        if self.last is not None:
+            self.accumulator += now - self.last
+        self.last = now
+        ticks = int(self.accumulator / self.dt)
+        if ticks > self.maxTicks:
+            #Too far behind to catch up, drop the backlog rather than spiral
+            ticks = self.maxTicks
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.dt
+        return ticks
+
+    def alpha(self):
+        if self.lockstep:
+            return 1.0
+        return min(1.0, self.accumulator / self.dt)
+
+def refreshRate(default=60):
+    ''' Refresh rate of the main display where pygame can tell, otherwise default '''
+    rates = getattr(pygame.display, 'get_desktop_refresh_rates', None)
+    try:
+        rate = rates()[0] if rates else 0
+    except (pygame.error, IndexError):
+        rate = 0
+    return rate or default
+
+def lerp(old, new, alpha, snap=50):
+    ''' Position between old and new, jumps further than snap pixels aren't smoothed '''
+    if old is None or alpha >= 1.0:
+        return new
+    (ox, oy), (x, y) = old, new
+    if abs(x - ox) > snap or abs(y - oy) > snap:
+        return new
+    return (round(ox + (x - ox) * alpha), round(oy + (y - oy) * alpha))
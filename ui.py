@@ -0,0 +1,111 @@
+''' Widgets shared by the game and its screens '''
+import sys
+
+import pygame
+
+import display
+import fonts
+
+#Helper functions
+def exitGame():
+    pygame.quit()
+    sys.exit()
+
+#UI Tools
+class Button:
+    def __init__(self, screen, position, text, **kwargs):
+        self.screen = screen
+        self.position = position
+        self.font = fonts.font('Garamond', 40)
+        self.bg = kwargs.get('bg', (255,165,0))
+        self.fg = kwargs.get('fg', (255, 0, 0))
+        states = ['normal', 'disabled']
+        self.state = kwargs.get('state', 'normal')
+        pad = kwargs.get('pad', 0)
+        self.text_render = fonts.render(self.font, text.center(len(text) + pad), 1, self.fg)
+        #Area covered by the text and its border lines
+        self.rect = self.text_render.get_rect(topleft=position).inflate(8, 8)
+        self.render_object = self.text_render.get_rect(topleft=position)
+        self.surface = None
+        self.draw()
+        
+    def draw(self, screen=None, position=None):
+        screen = screen or self.screen
+        x, y, w, h = self.text_render.get_rect()
+        x, y = position or self.position
+        pygame.draw.line(screen, self.bg, (x, y), (x + w , y), 5)
+        pygame.draw.line(screen, self.bg, (x, y - 2), (x, y + h), 5)
+        pygame.draw.line(screen, [abs(val-100) for val in self.bg], (x, y + h), (x + w , y + h), 5)
+        pygame.draw.line(screen, [abs(val-100) for val in self.bg], (x + w , y+h), [x + w , y], 5)
+        pygame.draw.rect(screen, [abs(val-50) for val in self.bg], (x, y, w , h))
+        screen.blit(self.text_render, (x, y))
+
+    def image(self):
+        ''' The button on a transparent surface the size of rect, for drawing as a sprite '''
+        if self.surface is None:
+            self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            self.draw(self.surface, (self.position[0] - self.rect.x, self.position[1] - self.rect.y))
+        return self.surface
+
+    def clicked(self):
+        if self.state == 'normal':
+            return self.render_object.collidepoint(display.mousePos())
+        return False
+
+class InputBox:
+    def __init__(self, x, y, w, h, text=''):
+        self.COLOR_INACTIVE = (255, 0, 0)
+        self.COLOR_ACTIVE = (0, 0, 255)
+        self.GEN_COLOR = (34, 139, 34)
+        self.rect = pygame.Rect(x, y, w, h)
+        self.color = self.COLOR_INACTIVE
+        self.defaultText = self.text = text
+        self.font = fonts.font('Arial', 50)
+        self.txt_surface = fonts.render(self.font, text, True, self.color)
+        self.active = False
+        self.val = ''
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            #If the user clicked on the input_box rect.
+            if self.rect.collidepoint(event.pos):
+                #Toggle the active variable.
+                self.active = not self.active
+                if self.text == '':
+                    self.text = self.defaultText
+                elif self.text == self.defaultText:
+                    self.text = ''
+                self.txt_surface = fonts.render(self.font, self.text, True, self.color)
+            else:
+                self.active = False
+            #Change the current color of the input box.
+            if self.active:
+                self.color = self.COLOR_ACTIVE
+            elif self.val:
+                self.color = self.GEN_COLOR
+            else:
+                self.color = self.COLOR_INACTIVE
+                
+        if event.type == pygame.KEYDOWN:
+            if self.active:
+                if event.key == pygame.K_RETURN:
+                    self.val = self.text
+                    self.color = self.GEN_COLOR
+                    self.active = False
+                elif event.key == pygame.K_BACKSPACE:
+                    self.text = self.text[:-1]
+                elif len(self.text) < 10:
+                    self.text += event.unicode
+                #Re-render the text.
+                self.txt_surface = fonts.render(self.font, self.text, True, self.color)
+
+    def update(self):
+        #Resize the box if the text is too long.
+        width = max(200, self.txt_surface.get_width()+10)
+        self.rect.w = width
+
+    def draw(self, screen):
+        #Blit the text.
+        screen.blit(self.txt_surface, (self.rect.x+5, self.rect.y+5))
+        #Blit the rect.
+        pygame.draw.rect(screen, self.color, self.rect, 2)